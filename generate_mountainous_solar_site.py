@@ -30,7 +30,7 @@ from blenderproc.python.utility.Utility import Utility
 
 # Import new modules
 try:
-    from pile_factory import create_pile_variant
+    from pile_factory import create_pile_variant, create_pile_batch
     from pile_layout_engine import layout_piles_with_constraints
     from environmental_storytelling import (
         create_track_marks,
@@ -46,6 +46,8 @@ except ImportError as e:
     # Define placeholder functions to avoid NameError
     def create_pile_variant(*args, **kwargs):
         raise NotImplementedError("Advanced features not available")
+    def create_pile_batch(*args, **kwargs):
+        raise NotImplementedError("Advanced features not available")
     def layout_piles_with_constraints(*args, **kwargs):
         raise NotImplementedError("Advanced features not available")
     def create_track_marks(*args, **kwargs):
@@ -1183,16 +1185,13 @@ def write_yolo_annotations(
     annotations = []
     
     for instance_id in unique_ids:
-        # Get mask for this instance
-        mask = (segmap == instance_id).astype(np.uint8)
-        
-        # Find bounding box
-        coords = np.column_stack(np.where(mask > 0))
-        if len(coords) == 0:
+        # Find bounding box from the pixel coordinates of this instance
+        ys, xs = np.nonzero(segmap == instance_id)
+        if len(ys) == 0:
             continue
         
-        y_min, x_min = coords.min(axis=0)
-        y_max, x_max = coords.max(axis=0)
+        y_min, y_max = ys.min(), ys.max()
+        x_min, x_max = xs.min(), xs.max()
         
         # Convert to YOLO format (normalized center x, center y, width, height)
         center_x = (x_min + x_max) / 2.0 / image_width
@@ -1375,43 +1374,28 @@ def generate_single_image(
             num_groups=num_groups,
             piles_per_group=piles_per_group,
             road_width=8.0,
-            asset_path=asset_path
+            asset_path=asset_path,
+            use_terrain_grid=kwargs.get('use_terrain_grid')
         )
         
-        # Create piles using factory
-        for pile_info in pile_info_list:
-            pos = pile_info['position']
-            terrain_z = pile_info['terrain_z']
-            tilt = pile_info['tilt']
-            pile_type = pile_info['pile_type']
-            pile_params = pile_info['pile_params']
-            
-            # Override pile type based on preset (if specified)
-            if preset_config:
-                pile_type_rand = np.random.random()
-                pile_type_probs = preset_config.get('pile_type_probability', {})
-                if pile_type_probs:
-                    pile_type = np.random.choice(
-                        list(pile_type_probs.keys()),
-                        p=list(pile_type_probs.values())
-                    )
-            
-            # Create pile using factory
-            pile_obj, attachment = create_pile_variant(
-                pile_type=pile_type,
-                location=pos,
-                terrain_z=terrain_z,
-                **pile_params
+        # Override pile type based on preset (if specified)
+        pile_type_probs = preset_config.get('pile_type_probability', {}) if preset_config else {}
+        if pile_type_probs:
+            pile_types = np.random.choice(
+                list(pile_type_probs.keys()),
+                size=len(pile_info_list),
+                p=list(pile_type_probs.values())
             )
-            
-            # Apply tilt (engineering tolerance)
-            pile_obj.set_rotation_euler(tilt)
-            
+            for pile_info, pile_type in zip(pile_info_list, pile_types):
+                pile_info['pile_type'] = str(pile_type)
+        
+        # Create all piles in one batch (tilt from engineering tolerance is applied by the factory)
+        for pile_info, (pile_obj, attachment) in zip(pile_info_list, create_pile_batch(pile_info_list)):
             piles.append(pile_obj)
             if attachment:
                 piles.append(attachment)
             
-            pile_positions.append(pos)
+            pile_positions.append(pile_info['position'])
         
         print(f"Total piles created: {len(piles)} (using advanced factory)")
     else:
@@ -1666,6 +1650,7 @@ def main() -> None:
     parser.add_argument('--save_hdf5', action='store_true', help="Save HDF5 files (optional, for visualization)")
     parser.add_argument('--save_coco', action='store_true', help="Save COCO annotations (optional)")
     parser.add_argument('--use_advanced_features', action='store_true', default=True, help="Use advanced features (high-fidelity piles, constraint-based layout, environmental storytelling)")
+    parser.add_argument('--terrain_grid', type=str, choices=["auto", "on", "off"], default="auto", help="Rasterize the terrain height field before pile layout: 'on' always, 'off' never, 'auto' when it needs fewer rays than per-pile ray casts")
     parser.add_argument('--geological_preset', type=str, choices=["loess", "hills"], default=None, help="Geological preset: 'loess' (黄土高原) or 'hills' (南方丘陵). If not set, randomly chosen.")
     args = parser.parse_args()
     
@@ -1918,6 +1903,7 @@ def main() -> None:
     # Generate single image (no cleanup needed - fresh process)
     # Add advanced features parameters
     kwargs['use_advanced_features'] = args.use_advanced_features
+    kwargs['use_terrain_grid'] = {"auto": None, "on": True, "off": False}[args.terrain_grid]
     if args.geological_preset:
         kwargs['geological_preset'] = args.geological_preset
     
@@ -17,13 +17,18 @@ This script creates a procedurally generated scene with:
 Author: Computer Vision Engineer
 """
 import argparse
+import itertools
 import numpy as np
 import os
 import cv2
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional
 import bpy
 
+# Verbose diagnostics (scene inspection, per-instance prints). Enable with BPROC_DEBUG=1 or --debug.
+DEBUG = os.environ.get("BPROC_DEBUG") == "1"
+
 
 def write_yolo_annotations(
     output_dir: str,
@@ -48,9 +53,13 @@ def write_yolo_annotations(
     labels_dir = os.path.join(output_dir, "labels")
     os.makedirs(labels_dir, exist_ok=True)
 
-    for frame_idx, (segmap, attr_map) in enumerate(zip(instance_segmaps, instance_attribute_maps)):
+    def _one(frame_idx: int, segmap: np.ndarray, attr_map) -> Tuple[str, np.ndarray]:
         height, width = segmap.shape[:2]
-        annotations = []
+        # Frame-constant reciprocals: normalize with multiplies instead of per-instance divides
+        inv_w = 1.0 / width
+        inv_h = 1.0 / height
+        half_inv_w = 0.5 * inv_w
+        half_inv_h = 0.5 * inv_h
 
         # Create a mapping from instance ID to attributes
         # attr_map is a list of dicts: [{"idx": 0, "category_id": 0, ...}, ...]
@@ -64,13 +73,16 @@ def write_yolo_annotations(
 
         # Get unique instance IDs from segmentation map
         unique_ids = np.unique(segmap)
+        # Preallocate one row per instance and trim afterwards instead of growing a list
+        annotations = np.empty((len(unique_ids), 5), dtype=np.float64)
+        num_annotations = 0
         
         # Debug: print first frame info
-        if frame_idx == 0:
+        if DEBUG and frame_idx == 0:
             print(f"Debug: Found {len(unique_ids)} unique IDs in segmap (excluding 0)")
             print(f"Debug: Attribute map has {len(inst_id_to_attrs)} entries")
             if len(inst_id_to_attrs) > 0:
-                print(f"Debug: First few entries: {list(inst_id_to_attrs.items())[:3]}")
+                print(f"Debug: First few entries: {list(itertools.islice(inst_id_to_attrs.items(), 3))}")
         
         for inst_id in unique_ids:
             if inst_id == 0:  # Skip background
@@ -81,7 +93,7 @@ def write_yolo_annotations(
             category_id = inst_info.get("category_id", None)
             
             # Debug output for first frame
-            if frame_idx == 0 and inst_id <= 5:
+            if DEBUG and frame_idx == 0 and inst_id <= 5:
                 print(f"Debug: inst_id={inst_id}, category_id={category_id}, inst_info={inst_info}")
             
             # If category_id is None, the instance might not be in the mapping
@@ -95,33 +107,39 @@ def write_yolo_annotations(
             elif category_id != class_id:
                 continue
             
-            # Create binary mask for this instance
-            binary_mask = (segmap == inst_id).astype(np.uint8)
-            
-            # Find bounding box
-            coords = np.column_stack(np.where(binary_mask > 0))
-            if len(coords) == 0:
+            # Find bounding box from the pixel coordinates of this instance
+            ys, xs = np.nonzero(segmap == inst_id)
+            if len(ys) == 0:
                 continue
             
-            y_min, x_min = coords.min(axis=0)
-            y_max, x_max = coords.max(axis=0)
+            y_min, y_max = ys.min(), ys.max()
+            x_min, x_max = xs.min(), xs.max()
             
             # Calculate normalized YOLO format: center_x, center_y, width, height
-            center_x = (x_min + x_max) / 2.0 / width
-            center_y = (y_min + y_max) / 2.0 / height
-            bbox_width = (x_max - x_min) / width
-            bbox_height = (y_max - y_min) / height
+            center_x = (x_min + x_max) * half_inv_w
+            center_y = (y_min + y_max) * half_inv_h
+            bbox_width = (x_max - x_min) * inv_w
+            bbox_height = (y_max - y_min) * inv_h
             
             # Skip if bbox is too small
             if bbox_width < 0.01 or bbox_height < 0.01:
                 continue
             
-            annotations.append(f"{class_id} {center_x:.6f} {center_y:.6f} {bbox_width:.6f} {bbox_height:.6f}")
+            annotations[num_annotations] = (class_id, center_x, center_y, bbox_width, bbox_height)
+            num_annotations += 1
+        annotations = annotations[:num_annotations]
         
-        # Write annotation file
         annotation_file = os.path.join(labels_dir, f"{image_prefix}{frame_idx:06d}.txt")
-        with open(annotation_file, 'w') as f:
-            f.write('\n'.join(annotations))
+        return annotation_file, annotations
+
+    # Frames are independent and the heavy lifting is NumPy (which releases the GIL),
+    # so process them in parallel threads
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        results = list(ex.map(_one, range(len(instance_segmaps)), instance_segmaps, instance_attribute_maps))
+
+    # Write annotation files (one vectorized formatting call per frame)
+    for annotation_file, annotations in results:
+        np.savetxt(annotation_file, annotations, fmt="%d %.6f %.6f %.6f %.6f")
 
 
 def create_pile_with_patch(
@@ -365,11 +383,25 @@ def main() -> None:
         default=1978,
         help="Render height in pixels (default: 1978, use 3956 to match real data)"
     )
+    parser.add_argument(
+        '--debug',
+        action='store_true',
+        help="Print verbose scene and annotation diagnostics (same as BPROC_DEBUG=1)"
+    )
     args = parser.parse_args()
     
+    global DEBUG
+    DEBUG = DEBUG or args.debug
+    
     # Initialize BlenderProc
     bproc.init()
     
+    # 8-bit color pass with the Standard view transform: the JPEG output is
+    # quantized to uint8 anyway, so a float framebuffer only costs bandwidth
+    bproc.renderer.set_output_format(color_depth=8, view_transform="Standard")
+    # Box filter is the cheapest pixel filter and sufficient for labelled frames
+    bpy.context.scene.cycles.pixel_filter_type = 'BOX'
+    
     # Set high resolution to match real drone images (5280x3956)
     # Real drone orthographic images are very high resolution
     # Use 5280x3956 to match the real dataset, or scale down for faster rendering
@@ -544,16 +576,16 @@ def main() -> None:
     print("Rendering...")
     
     # Debug: Check all objects before rendering
-    import bpy
-    all_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
-    print(f"Debug: Total mesh objects in scene: {len(all_objects)}")
-    pile_objects = [obj for obj in all_objects if 'pile' in obj.name.lower()]
-    print(f"Debug: Pile objects found: {len(pile_objects)}")
-    for i, obj in enumerate(pile_objects[:3]):
-        cat_id = obj.get('category_id', 'N/A')
-        # Check if object is above ground
-        above_ground = obj.location.z > 0.5  # Should be at least 0.5m above ground
-        print(f"  Pile {i}: {obj.name}, loc: ({obj.location.x:.2f}, {obj.location.y:.2f}, {obj.location.z:.2f}), cat_id: {cat_id}, above_ground: {above_ground}, visible: {not obj.hide_render}")
+    if DEBUG:
+        all_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+        print(f"Debug: Total mesh objects in scene: {len(all_objects)}")
+        pile_objects = [obj for obj in all_objects if 'pile' in obj.name.lower()]
+        print(f"Debug: Pile objects found: {len(pile_objects)}")
+        for i, obj in enumerate(pile_objects[:3]):
+            cat_id = obj.get('category_id', 'N/A')
+            # Check if object is above ground
+            above_ground = obj.location.z > 0.5  # Should be at least 0.5m above ground
+            print(f"  Pile {i}: {obj.name}, loc: ({obj.location.x:.2f}, {obj.location.y:.2f}, {obj.location.z:.2f}), cat_id: {cat_id}, above_ground: {above_ground}, visible: {not obj.hide_render}")
     
     # Enable segmentation output for bounding box generation
     # Use "category_id" and "instance" to get both class and instance segmentation
@@ -564,29 +596,30 @@ def main() -> None:
     )
     
     # Debug: Check pass_index and category_id after enabling segmentation
-    print(f"Debug: After enabling segmentation:")
-    for i, obj in enumerate(pile_objects[:3]):
-        cat_id_cp = obj.get('category_id', None)
-        cat_id_blender = obj.get('category_id', None) if hasattr(obj, 'get') else None
-        print(f"  Pile {i}: {obj.name}, pass_index: {obj.pass_index}, category_id: {cat_id_cp}")
+    if DEBUG:
+        print(f"Debug: After enabling segmentation:")
+        for i, obj in enumerate(pile_objects[:3]):
+            cat_id_cp = obj.get('category_id', None)
+            print(f"  Pile {i}: {obj.name}, pass_index: {obj.pass_index}, category_id: {cat_id_cp}")
     
     # Render
     data = bproc.renderer.render()
     
     # Debug: Check what we got
-    print(f"Debug: Rendered {len(data.get('colors', []))} frames")
-    print(f"Debug: Instance segmaps: {len(data.get('instance_segmaps', []))} frames")
-    print(f"Debug: Attribute maps: {len(data.get('instance_attribute_maps', []))} frames")
-    if len(data.get('instance_segmaps', [])) > 0:
-        segmap = data['instance_segmaps'][0]
-        unique_ids = np.unique(segmap)
-        print(f"Debug: Unique IDs in first segmap: {unique_ids}")
-        print(f"Debug: Segmap shape: {segmap.shape}, min={segmap.min()}, max={segmap.max()}")
-    if len(data.get('instance_attribute_maps', [])) > 0:
-        print(f"Debug: First frame attribute map type: {type(data['instance_attribute_maps'][0])}")
-        print(f"Debug: First frame attribute map length: {len(data['instance_attribute_maps'][0]) if isinstance(data['instance_attribute_maps'][0], list) else 'N/A'}")
-        if isinstance(data['instance_attribute_maps'][0], list):
-            print(f"Debug: All entries: {data['instance_attribute_maps'][0]}")
+    if DEBUG:
+        print(f"Debug: Rendered {len(data.get('colors', []))} frames")
+        print(f"Debug: Instance segmaps: {len(data.get('instance_segmaps', []))} frames")
+        print(f"Debug: Attribute maps: {len(data.get('instance_attribute_maps', []))} frames")
+        if len(data.get('instance_segmaps', [])) > 0:
+            segmap = data['instance_segmaps'][0]
+            unique_ids = np.unique(segmap)
+            print(f"Debug: Unique IDs in first segmap: {unique_ids}")
+            print(f"Debug: Segmap shape: {segmap.shape}, min={segmap.min()}, max={segmap.max()}")
+        if len(data.get('instance_attribute_maps', [])) > 0:
+            print(f"Debug: First frame attribute map type: {type(data['instance_attribute_maps'][0])}")
+            print(f"Debug: First frame attribute map length: {len(data['instance_attribute_maps'][0]) if isinstance(data['instance_attribute_maps'][0], list) else 'N/A'}")
+            if isinstance(data['instance_attribute_maps'][0], list):
+                print(f"Debug: All entries: {data['instance_attribute_maps'][0]}")
     
     # ========== SAVE OUTPUTS ==========
     print("Saving outputs...")
@@ -597,12 +630,19 @@ def main() -> None:
     os.makedirs(images_dir, exist_ok=True)
     
     for frame_idx, color_image in enumerate(data["colors"]):
-        # Convert to BGR for OpenCV
-        color_bgr = color_image.copy()
-        color_bgr[..., :3] = color_bgr[..., :3][..., ::-1]
+        # Rendered with color_depth=8, so frames arrive as uint8 in [0, 255] and pass through as-is;
+        # float frames are colors in [0, 1] and are scaled and saturate-cast in one fused OpenCV pass
+        if color_image.dtype == np.uint8:
+            img_u8 = color_image
+        elif np.issubdtype(color_image.dtype, np.floating):
+            img_u8 = cv2.convertScaleAbs(color_image, alpha=255)
+        else:
+            img_u8 = cv2.convertScaleAbs(color_image)
+        # RGB -> BGR via a reversed channel view, made contiguous once for OpenCV
+        img_bgr = np.ascontiguousarray(img_u8[..., 2::-1])
         
         image_path = os.path.join(images_dir, f"image_{frame_idx:06d}.jpg")
-        cv2.imwrite(image_path, (color_bgr * 255).astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 95])
+        cv2.imwrite(image_path, img_bgr, [cv2.IMWRITE_JPEG_QUALITY, 95])
     
     # Write YOLO format annotations
     write_yolo_annotations(
@@ -0,0 +1,56 @@
+"""
+Merge the per-worker shards written by generate_solar_farm_simple.py --worker_idx into one dataset.
+
+Each shard_<i>/ directory contains images/ and labels/ with frame-local indices. They are moved to
+<output_dir>/images and <output_dir>/labels with consecutive global indices (shard order, then frame order).
+
+Usage:
+    python merge_shards.py <output_dir>
+"""
+import argparse
+import re
+import shutil
+from pathlib import Path
+
+
+def merge_shards(output_dir: str, image_prefix: str = "image_") -> int:
+    """
+    Merge all shard_<i> subdirectories of output_dir into output_dir/images and output_dir/labels.
+
+    :param output_dir: Directory containing the shard_<i> subdirectories
+    :param image_prefix: Prefix of the image/label filenames
+    :return: Number of merged frames
+    """
+    output_path = Path(output_dir)
+    images_dir = output_path / "images"
+    labels_dir = output_path / "labels"
+    images_dir.mkdir(parents=True, exist_ok=True)
+    labels_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = [d for d in output_path.iterdir() if d.is_dir() and re.fullmatch(r"shard_\d+", d.name)]
+    shards.sort(key=lambda d: int(d.name.split("_")[1]))
+
+    global_idx = 0
+    for shard in shards:
+        for image_path in sorted((shard / "images").glob(f"{image_prefix}*.jpg")):
+            label_path = shard / "labels" / f"{image_path.stem}.txt"
+            new_stem = f"{image_prefix}{global_idx:06d}"
+            shutil.move(str(image_path), str(images_dir / f"{new_stem}.jpg"))
+            if label_path.exists():
+                shutil.move(str(label_path), str(labels_dir / f"{new_stem}.txt"))
+            global_idx += 1
+
+    return global_idx
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge sharded solar farm dataset outputs")
+    parser.add_argument('output_dir', help="Directory containing the shard_<i> subdirectories")
+    args = parser.parse_args()
+
+    num_frames = merge_shards(args.output_dir)
+    print(f"Merged {num_frames} frames into {args.output_dir}/images and {args.output_dir}/labels")
+
+
+if __name__ == "__main__":
+    main()
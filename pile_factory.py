@@ -7,22 +7,445 @@ High-Fidelity Pile Asset Factory
 - 表 5.1 和 表 3-1 中的物理参数
 """
 
-import blenderproc as bproc
+from __future__ import annotations
+
+import functools
+import os
+import threading
 import numpy as np
-import bpy
-import mathutils
-from typing import Optional, Tuple, Literal
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Literal
 from pathlib import Path
-from blenderproc.python.utility.Utility import Utility
+
+# 可选：numba 编译的网格顶点构建（高分段数时使用；未安装时回退到 NumPy）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# bpy / blenderproc 只在创建桩时才需要，延迟到函数内部导入，仅导入本模块（如读取常量）时不付出其导入开销
+if TYPE_CHECKING:
+    import blenderproc as bproc
+    import bpy
 
 
 # 全局缓存：避免重复加载材质
 _CONCRETE_TEXTURE_CACHE = None
+_CONCRETE_TEXTURE_LOCK = threading.Lock()
+# 已加载的图像（按路径），避免每根桩重复解码同一张贴图
+_IMAGE_CACHE: Dict[str, bpy.types.Image] = {}
+# 已构建的桩材质（按材质参数），相同参数的桩共享同一材质数据块
+_MATERIAL_TEMPLATE_CACHE: Dict[tuple, bproc.types.Material] = {}
+# 已构建的桩部件网格（按构建函数、几何参数和材质），相同的桩部件共享网格，唯一网格数随变体数而非桩数增长；
+# 桩身长度是连续量，不进入键：桩身网格为单位高度，长度由对象 Z 缩放给出
+_PILE_MESH_CACHE: Dict[tuple, bpy.types.Mesh] = {}
+# 网格数组构建函数的缓存容量（键只含离散的半径/分段数，正常情况下远不会用满）
+_MESH_BUILDER_CACHE_SIZE = 64
+# 共享的混凝土节点组名称
+CONCRETE_NODE_GROUP_NAME = "PileConcreteNG"
+# 对象自定义属性：桩的老化程度（0=新桩，1=陈旧桩），由混凝土节点组读取
+PILE_AGE_PROPERTY = "pile_age"
+# 对象自定义属性：桩身长度（m）。桩身网格为单位高度并按此长度做 Z 缩放，螺旋痕迹着色器用它把对象坐标换算回米
+PILE_LENGTH_PROPERTY = "pile_length"
+# 灌注桩纸筒模具螺旋痕迹的密度（圈/米）
+SPIRAL_MARK_TURNS_PER_METER = 10.0
+# 模块级随机数生成器（首次使用时由全局 np.random 状态派生种子，保证 np.random.seed 仍可复现）
+_RNG: Optional[np.random.Generator] = None
+# 漏浆结块参数 [dx, dy, sx, sy, sz] 的取值范围
+_LEAKAGE_LOW = np.array([-0.05, -0.05, 0.8, 0.8, 0.5])
+_LEAKAGE_HIGH = np.array([0.05, 0.05, 1.2, 1.2, 0.8])
+# 分段数达到该值时才走 numba 路径（低分段时 NumPy 广播已足够快）
+_NUMBA_MIN_SEGMENTS = 64
+
+
+def _get_rng() -> np.random.Generator:
+    """
+    获取模块级随机数生成器。
+    
+    :return: 随机数生成器
+    """
+    global _RNG
+    if _RNG is None:
+        _RNG = np.random.default_rng(np.random.randint(0, 2**31 - 1))
+    return _RNG
+
+
+def draw_leakage_params(n: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    一次抽取 n 根灌注桩的漏浆结块参数，供批量创建时预先抽取后按行传入 leakage_params。
+    
+    :param n: 桩数量
+    :param rng: 随机数生成器，None 则使用模块级生成器
+    :return: [n, 5] 数组，每行为 [dx, dy, sx, sy, sz]
+    """
+    rng = rng if rng is not None else _get_rng()
+    return rng.uniform(_LEAKAGE_LOW, _LEAKAGE_HIGH, size=(n, 5))
+
+
+@functools.lru_cache(maxsize=None)
+def _unit_circle(segments: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    单位圆的 cos/sin 表（float32），所有圆柱/圆管/圆环构建函数共用。
+    
+    :param segments: 圆周分段数
+    :return: (cos[segments], sin[segments])
+    """
+    theta = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False, dtype=np.float32)
+    c, s = np.cos(theta), np.sin(theta)
+    c.flags.writeable = False
+    s.flags.writeable = False
+    return c, s
+
+
+def _fill_rings_numpy(c: np.ndarray, s: np.ndarray, radii: np.ndarray, zs: np.ndarray, out: np.ndarray) -> None:
+    """
+    写入若干同轴水平圆圈的顶点：out[r, k] = (radii[r]·c[k], radii[r]·s[k], zs[r])。
+    
+    :param c: 单位圆 cos 表
+    :param s: 单位圆 sin 表
+    :param radii: 每圈半径
+    :param zs: 每圈高度
+    :param out: 输出 [num_rings, segments, 3]
+    """
+    out[:, :, 0] = radii[:, None] * c
+    out[:, :, 1] = radii[:, None] * s
+    out[:, :, 2] = zs[:, None]
+
+
+def _fill_torus_numpy(cu: np.ndarray, su: np.ndarray, cv: np.ndarray, sv: np.ndarray,
+                      major: float, minor: float, out: np.ndarray) -> None:
+    """
+    写入XY平面圆环的顶点：out[i, j] = ((R + r·cv[j])·cu[i], (R + r·cv[j])·su[i], r·sv[j])。
+    
+    :param cu: 主圆周 cos 表
+    :param su: 主圆周 sin 表
+    :param cv: 截面 cos 表
+    :param sv: 截面 sin 表
+    :param major: 主半径
+    :param minor: 截面半径
+    :param out: 输出 [major_seg, minor_seg, 3]
+    """
+    ring_r = major + minor * cv  # 截面各点到主轴的距离
+    out[:, :, 0] = np.outer(cu, ring_r)
+    out[:, :, 1] = np.outer(su, ring_r)
+    out[:, :, 2] = minor * sv
+
+
+if NUMBA_AVAILABLE:
+    # 纯数组循环，不涉及 bpy；cache=True 将编译结果缓存到磁盘，避免每次启动重新编译
+    @njit(cache=True, fastmath=True)
+    def _fill_rings_jit(c, s, radii, zs, out):
+        for r in range(out.shape[0]):
+            for k in range(out.shape[1]):
+                out[r, k, 0] = radii[r] * c[k]
+                out[r, k, 1] = radii[r] * s[k]
+                out[r, k, 2] = zs[r]
+
+    @njit(cache=True, fastmath=True)
+    def _fill_torus_jit(cu, su, cv, sv, major, minor, out):
+        for i in range(out.shape[0]):
+            for j in range(out.shape[1]):
+                ring_r = major + minor * cv[j]
+                out[i, j, 0] = ring_r * cu[i]
+                out[i, j, 1] = ring_r * su[i]
+                out[i, j, 2] = minor * sv[j]
+
+
+def _fill_rings(c: np.ndarray, s: np.ndarray, radii: np.ndarray, zs: np.ndarray, out: np.ndarray) -> None:
+    """按分段数选择 numba 或 NumPy 实现，参数同 _fill_rings_numpy。"""
+    if NUMBA_AVAILABLE and len(c) >= _NUMBA_MIN_SEGMENTS:
+        _fill_rings_jit(c, s, radii, zs, out)
+    else:
+        _fill_rings_numpy(c, s, radii, zs, out)
+
+
+def _fill_torus(cu: np.ndarray, su: np.ndarray, cv: np.ndarray, sv: np.ndarray,
+                major: float, minor: float, out: np.ndarray) -> None:
+    """按分段数选择 numba 或 NumPy 实现，参数同 _fill_torus_numpy。"""
+    if NUMBA_AVAILABLE and len(cu) >= _NUMBA_MIN_SEGMENTS:
+        _fill_torus_jit(cu, su, cv, sv, np.float32(major), np.float32(minor), out)
+    else:
+        _fill_torus_numpy(cu, su, cv, sv, major, minor, out)
+
+
+def _ring_quads(segments: int, a: int, b: int) -> np.ndarray:
+    """
+    连接两圈顶点（起始索引 a、b，每圈 segments 个）的四边形索引 [segments,4]，首尾闭合。
+    
+    :param segments: 每圈顶点数
+    :param a: 第一圈起始顶点索引
+    :param b: 第二圈起始顶点索引
+    :return: int32 四边形索引
+    """
+    i = np.arange(segments, dtype=np.int32)
+    j = (i + 1) % segments
+    return np.stack([a + i, a + j, b + j, b + i], axis=1)
+
+
+def _wall_uv(segments: int) -> np.ndarray:
+    """
+    _ring_quads 四边形的圆柱展开UV [segments,4,2]：u = θ/2π 沿圆周（接缝处取1而非0），v 从第一圈0到第二圈1。
+    
+    :param segments: 每圈顶点数
+    :return: float32 UV
+    """
+    u0 = np.arange(segments, dtype=np.float32) / segments
+    u1 = u0 + np.float32(1.0 / segments)
+    uv = np.empty((segments, 4, 2), dtype=np.float32)
+    uv[:, :, 0] = np.stack([u0, u1, u1, u0], axis=1)
+    uv[:, :, 1] = (0.0, 0.0, 1.0, 1.0)
+    return uv
+
+
+def _freeze(*arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """将缓存返回的数组设为只读，防止调用方修改 lru_cache 中的共享数据。"""
+    for arr in arrays:
+        arr.flags.writeable = False
+    return arrays
+
+
+@functools.lru_cache(maxsize=_MESH_BUILDER_CACHE_SIZE)
+def _build_cylinder_mesh(
+    radius: float,
+    depth: float,
+    segments: int = 32
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    计算闭合圆柱的顶点、拓扑和UV数组（以原点为中心，与 primitive_cylinder_add 的几何一致）。
+    
+    同一 (radius, depth, segments) 只计算一次，返回的数组为只读。
+    顶点为 float32、索引为 int32，与 Blender 内部缓冲区布局一致，foreach_set 无需转换。
+    
+    :param radius: 半径（m）
+    :param depth: 高度（m）
+    :param segments: 圆周分段数
+    :return: (verts[N,3], loop_start, loop_total, loop_verts, uv[num_loops,2])
+    """
+    c, s = _unit_circle(segments)
+    verts = np.empty((2, segments, 3), dtype=np.float32)
+    _fill_rings(
+        c, s,
+        np.array([radius, radius], dtype=np.float32),
+        np.array([-depth / 2.0, depth / 2.0], dtype=np.float32),  # 底圈 0..s-1，顶圈 s..2s-1
+        verts
+    )
+    
+    ring = np.arange(segments, dtype=np.int32)
+    loop_verts = np.concatenate([
+        _ring_quads(segments, 0, segments).ravel(),
+        segments + ring,  # 顶面
+        ring[::-1]        # 底面，反向使法线朝下
+    ])
+    loop_total = np.full(segments + 2, 4, dtype=np.int32)
+    loop_total[-2:] = segments
+    loop_start = np.zeros(segments + 2, dtype=np.int32)
+    np.cumsum(loop_total[:-1], out=loop_start[1:])
+    
+    # 侧面按圆柱展开，上下底面按圆盘映射
+    disk_uv = np.tile(0.5 + 0.5 * np.stack([c, s], axis=1), (2, 1))
+    uv = np.concatenate([_wall_uv(segments).reshape(-1, 2), disk_uv[loop_verts[4 * segments:]]])
+    
+    return _freeze(verts.reshape(-1, 3), loop_start, loop_total, loop_verts, uv)
+
+
+@functools.lru_cache(maxsize=_MESH_BUILDER_CACHE_SIZE)
+def _build_tube_mesh(
+    outer_r: float,
+    inner_r: float,
+    depth: float,
+    segments: int = 32
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    计算空心圆管的顶点、拓扑和UV数组（以原点为中心），替代外圆柱减内圆柱的布尔运算。
+    
+    顶点依次为外底圈、外顶圈、内底圈、内顶圈，面为外壁、内壁（反向）、顶部环面、底部环面四组四边形。
+    
+    :param outer_r: 外半径（m）
+    :param inner_r: 内半径（m）
+    :param depth: 高度（m）
+    :param segments: 圆周分段数
+    :return: (verts[4*segments,3], loop_start, loop_total, loop_verts, uv[16*segments,2])
+    """
+    c, s = _unit_circle(segments)
+    radii = np.array([outer_r, outer_r, inner_r, inner_r], dtype=np.float32)[:, None]
+    verts = np.empty((4, segments, 3), dtype=np.float32)
+    _fill_rings(
+        c, s,
+        radii[:, 0],
+        np.array([-depth / 2.0, depth / 2.0, -depth / 2.0, depth / 2.0], dtype=np.float32),
+        verts
+    )
+    
+    ob, ot, ib, it = 0, segments, 2 * segments, 3 * segments
+    loop_verts = np.concatenate([
+        _ring_quads(segments, ob, ot),                    # 外壁，法线朝外
+        _ring_quads(segments, ib, it)[:, [1, 0, 3, 2]],   # 内壁（反向），法线朝向轴心
+        _ring_quads(segments, ot, it),                    # 顶部环面
+        _ring_quads(segments, ob, ib)[:, [1, 0, 3, 2]]    # 底部环面（反向）
+    ]).ravel()
+    loop_total = np.full(4 * segments, 4, dtype=np.int32)
+    loop_start = np.arange(0, 16 * segments, 4, dtype=np.int32)
+    
+    # 内外壁按圆柱展开，环形端面按圆盘映射（外圈半径为0.5）
+    wall_uv = _wall_uv(segments)
+    disk_uv = (0.5 + 0.5 * (radii / outer_r)[:, :, None] * np.stack([c, s], axis=1)).reshape(-1, 2)
+    uv = np.concatenate([
+        wall_uv.reshape(-1, 2),
+        wall_uv[:, [1, 0, 3, 2]].reshape(-1, 2),
+        disk_uv[loop_verts[8 * segments:]]
+    ])
+    
+    return _freeze(verts.reshape(-1, 3), loop_start, loop_total, loop_verts, uv)
+
+
+@functools.lru_cache(maxsize=_MESH_BUILDER_CACHE_SIZE)
+def _build_torus_mesh(
+    major: float,
+    minor: float,
+    major_seg: int = 24,
+    minor_seg: int = 8
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    计算位于XY平面的圆环的顶点、拓扑和UV数组（以原点为中心）。
+    
+    :param major: 主半径（m）
+    :param minor: 截面半径（m）
+    :param major_seg: 主圆周分段数
+    :param minor_seg: 截面分段数
+    :return: (verts[major_seg*minor_seg,3], loop_start, loop_total, loop_verts, uv[num_loops,2])
+    """
+    cu, su = _unit_circle(major_seg)
+    cv, sv = _unit_circle(minor_seg)
+    verts = np.empty((major_seg, minor_seg, 3), dtype=np.float32)
+    _fill_torus(cu, su, cv, sv, major, minor, verts)
+    
+    i = np.arange(major_seg, dtype=np.int32)[:, None] * minor_seg
+    i1 = np.roll(i, -1, axis=0)
+    j = np.arange(minor_seg, dtype=np.int32)[None, :]
+    j1 = np.roll(j, -1, axis=1)
+    loop_verts = np.stack([i + j, i1 + j, i1 + j1, i + j1], axis=-1).ravel()
+    num_faces = major_seg * minor_seg
+    loop_total = np.full(num_faces, 4, dtype=np.int32)
+    loop_start = np.arange(0, 4 * num_faces, 4, dtype=np.int32)
+    
+    # u 沿主圆周，v 沿截面圆周
+    u_quad = _wall_uv(major_seg)[:, :, 0]
+    v_quad = _wall_uv(minor_seg)[:, [0, 0, 1, 1], 0]
+    uv = np.empty((major_seg, minor_seg, 4, 2), dtype=np.float32)
+    uv[..., 0] = u_quad[:, None, :]
+    uv[..., 1] = v_quad[None, :, :]
+    
+    return _freeze(verts.reshape(-1, 3), loop_start, loop_total, loop_verts, uv.reshape(-1, 2))
+
+
+def _create_mesh(
+    name: str,
+    verts: np.ndarray,
+    loop_start: np.ndarray,
+    loop_total: np.ndarray,
+    loop_verts: np.ndarray,
+    uv: np.ndarray
+) -> bpy.types.Mesh:
+    """
+    用 foreach_set 直接写入顶点/拓扑缓冲区创建网格，绕过 bpy.ops.mesh.primitive_*_add。
+    
+    :param name: 网格名称
+    :param verts: 顶点坐标 [N,3]
+    :param loop_start: 每个面的起始 loop 索引
+    :param loop_total: 每个面的顶点数
+    :param loop_verts: 每个 loop 的顶点索引
+    :param uv: 每个 loop 的UV坐标 [num_loops,2]
+    :return: 新建的网格
+    """
+    import bpy
+    
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.add(len(loop_verts))
+    mesh.loops.foreach_set("vertex_index", loop_verts)
+    mesh.polygons.add(len(loop_start))
+    mesh.polygons.foreach_set("loop_start", loop_start)
+    mesh.polygons.foreach_set("loop_total", loop_total)
+    # 解析UV，替代 add_uv_mapping("smart") 的 smart_project 聚类展开
+    mesh.uv_layers.new(name="UVMap").data.foreach_set("uv", uv.ravel())
+    mesh.update()
+    return mesh
+
+
+def _get_shared_mesh(
+    name: str,
+    builder,
+    builder_args: tuple,
+    material: Optional[bproc.types.Material]
+) -> bpy.types.Mesh:
+    """
+    获取（或创建并缓存）共享网格：几何参数和材质都相同的桩部件共用一个网格数据块（linked duplicate）。
+    
+    材质挂在网格上，只在创建网格时添加一次。
+    
+    :param name: 网格名称（仅首次创建时使用）
+    :param builder: 网格数组构建函数（_build_cylinder_mesh / _build_tube_mesh / _build_torus_mesh）
+    :param builder_args: 构建函数参数
+    :param material: 材质，None 表示不设置
+    :return: 网格
+    """
+    key = (builder.__name__, builder_args, material.blender_obj.name if material is not None else None)
+    mesh = _PILE_MESH_CACHE.get(key)
+    if mesh is None:
+        mesh = _create_mesh(name, *builder(*builder_args))
+        if material is not None:
+            mesh.materials.append(material.blender_obj)
+        _PILE_MESH_CACHE[key] = mesh
+    return mesh
+
+
+def _instance_mesh_object(
+    name: str,
+    builder,
+    builder_args: tuple,
+    material: Optional[bproc.types.Material]
+) -> bproc.types.MeshObject:
+    """
+    创建引用共享网格的对象，参数同 _get_shared_mesh。
+    
+    :return: 新建的网格对象
+    """
+    import blenderproc as bproc
+    
+    return bproc.object.create_from_blender_mesh(_get_shared_mesh(name, builder, builder_args, material), name)
+
+
+def _instance_pile_body(
+    name: str,
+    builder,
+    builder_args: tuple,
+    length: float,
+    material: Optional[bproc.types.Material]
+) -> bproc.types.MeshObject:
+    """
+    创建桩身对象：引用单位高度的共享网格（builder_args 不含高度），长度由对象 Z 缩放给出。
+    
+    桩身长度随桩连续变化（露出高度、总长度），若作为网格键则几乎每根桩一个网格；按此方式同半径、同材质的桩身只共享一个网格。
+    
+    :param name: 对象名称
+    :param builder: 网格数组构建函数（_build_cylinder_mesh / _build_tube_mesh），最后一个位置参数为高度
+    :param builder_args: 高度之前的构建函数参数（半径）
+    :param length: 桩身长度（m）
+    :param material: 材质，None 表示不设置
+    :return: 新建的网格对象（以原点为中心，高度为 length）
+    """
+    body = _instance_mesh_object(name, builder, builder_args + (1.0,), material)
+    body.set_scale([1.0, 1.0, length])
+    body.blender_obj[PILE_LENGTH_PROPERTY] = length
+    return body
 
 
 def load_concrete_texture(asset_path: Optional[str], print_found: bool = True) -> Optional[dict]:
     """
-    加载混凝土纹理（带缓存）。
+    加载混凝土纹理（带缓存，线程安全）。
+    
+    资产目录只扫描一次（大小写不敏感匹配 concrete），纹理文件的存在性由一次目录列举得到，不再逐个 stat。
     
     :param asset_path: 资产路径
     :param print_found: 是否打印找到信息
@@ -36,36 +459,300 @@ def load_concrete_texture(asset_path: Optional[str], print_found: bool = True) -
     if not asset_path:
         return None
     
-    base_path = Path(asset_path)
-    # 查找混凝土纹理（concrete047A 或其他）
-    concrete_folders = list(base_path.glob("*concrete*_4K-JPG")) + \
-                       list(base_path.glob("*Concrete*_4K-JPG"))
+    with _CONCRETE_TEXTURE_LOCK:
+        # 其他线程可能已在等待锁期间完成加载
+        if _CONCRETE_TEXTURE_CACHE is not None:
+            return _CONCRETE_TEXTURE_CACHE
+        
+        # 查找混凝土纹理（concrete047A 或其他）
+        try:
+            with os.scandir(asset_path) as it:
+                concrete_folders = sorted(
+                    entry.path for entry in it
+                    if entry.is_dir() and "concrete" in entry.name.lower() and entry.name.endswith("_4K-JPG")
+                )
+        except OSError:
+            return None
+        
+        if not concrete_folders:
+            return None
+        
+        folder = Path(concrete_folders[0])
+        folder_name = folder.name
+        with os.scandir(folder) as it:
+            files = {entry.name for entry in it if entry.is_file()}
+        
+        textures = {}
+        for key, suffix in (('color', "Color"), ('normal', "NormalGL"), ('roughness', "Roughness")):
+            file_name = f"{folder_name}_{suffix}.jpg"
+            if file_name in files:
+                textures[key] = folder / file_name
+        
+        if textures:
+            _CONCRETE_TEXTURE_CACHE = textures
+            if print_found:
+                print(f"  Loaded concrete texture: {folder_name}")
+            return textures
     
-    if not concrete_folders:
-        return None
+    return None
+
+
+def _get_image(path, non_color: bool = False) -> bpy.types.Image:
+    """
+    加载图像（带缓存），同一文件（按绝对路径）只加载一次。
+    
+    :param path: 图像路径
+    :param non_color: 是否为非颜色数据（法线、粗糙度贴图）
+    :return: Blender图像
+    """
+    import bpy
+    
+    key = bpy.path.abspath(str(path))
+    image = _IMAGE_CACHE.get(key)
+    if image is None:
+        image = bpy.data.images.load(key)
+        if non_color:
+            image.colorspace_settings.name = 'Non-Color'
+        _IMAGE_CACHE[key] = image
+    return image
+
+
+def _build_concrete_nodegroup(concrete_texture: Optional[dict]) -> bpy.types.ShaderNodeTree:
+    """
+    构建（或返回已有的）共享混凝土节点组。
     
-    folder = concrete_folders[0]
-    textures = {}
+    节点组内：对象属性 pile_age 在新/旧颜色和粗糙度之间混合；若有纹理，则 TexCoord→Mapping→颜色/法线/粗糙度贴图，
+    颜色贴图再按 Texture Fac 与基础色混合。所有混凝土桩材质都引用这一个节点组。
     
-    folder_name = folder.name
-    color_file = folder / f"{folder_name}_Color.jpg"
-    normal_file = folder / f"{folder_name}_NormalGL.jpg"
-    roughness_file = folder / f"{folder_name}_Roughness.jpg"
+    :param concrete_texture: load_concrete_texture 返回的纹理字典，None 表示纯色
+    :return: 节点组
+    """
+    import bpy
     
-    if color_file.exists():
-        textures['color'] = color_file
-    if normal_file.exists():
-        textures['normal'] = normal_file
-    if roughness_file.exists():
-        textures['roughness'] = roughness_file
+    group_name = CONCRETE_NODE_GROUP_NAME if concrete_texture else f"{CONCRETE_NODE_GROUP_NAME}_Plain"
+    group = bpy.data.node_groups.get(group_name)
+    if group is not None:
+        return group
     
-    if textures:
-        _CONCRETE_TEXTURE_CACHE = textures
-        if print_found:
-            print(f"  Loaded concrete texture: {folder_name}")
-        return textures
+    group = bpy.data.node_groups.new(name=group_name, type="ShaderNodeTree")
+    nodes, links = group.nodes, group.links
+    for socket_name, socket_type in (("New Color", "NodeSocketColor"), ("Aged Color", "NodeSocketColor"),
+                                     ("New Roughness", "NodeSocketFloat"), ("Aged Roughness", "NodeSocketFloat"),
+                                     ("Texture Fac", "NodeSocketFloat"), ("Texture Scale", "NodeSocketVector")):
+        group.interface.new_socket(socket_name, in_out='INPUT', socket_type=socket_type)
+    for socket_name, socket_type in (("Color", "NodeSocketColor"), ("Roughness", "NodeSocketFloat"),
+                                     ("Normal", "NodeSocketVector")):
+        group.interface.new_socket(socket_name, in_out='OUTPUT', socket_type=socket_type)
+    group_input = nodes.new("NodeGroupInput")
+    group_output = nodes.new("NodeGroupOutput")
     
-    return None
+    # 老化程度（对象属性，未设置时为0即新桩）
+    age = nodes.new("ShaderNodeAttribute")
+    age.attribute_type = 'OBJECT'
+    age.attribute_name = PILE_AGE_PROPERTY
+    
+    age_color = nodes.new("ShaderNodeMixRGB")
+    links.new(age.outputs["Fac"], age_color.inputs["Fac"])
+    links.new(group_input.outputs["New Color"], age_color.inputs["Color1"])
+    links.new(group_input.outputs["Aged Color"], age_color.inputs["Color2"])
+    
+    age_roughness = nodes.new("ShaderNodeMapRange")
+    links.new(age.outputs["Fac"], age_roughness.inputs["Value"])
+    links.new(group_input.outputs["New Roughness"], age_roughness.inputs["To Min"])
+    links.new(group_input.outputs["Aged Roughness"], age_roughness.inputs["To Max"])
+    
+    if not concrete_texture:
+        links.new(age_color.outputs["Color"], group_output.inputs["Color"])
+        links.new(age_roughness.outputs["Result"], group_output.inputs["Roughness"])
+        return group
+    
+    tex_coord = nodes.new(type='ShaderNodeTexCoord')
+    mapping = nodes.new(type='ShaderNodeMapping')
+    links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
+    links.new(group_input.outputs["Texture Scale"], mapping.inputs['Scale'])
+    
+    color_tex = nodes.new(type='ShaderNodeTexImage')
+    color_tex.image = _get_image(concrete_texture['color'])
+    links.new(mapping.outputs['Vector'], color_tex.inputs['Vector'])
+    
+    # 混合纹理和基础颜色
+    mix = nodes.new(type='ShaderNodeMixRGB')
+    links.new(group_input.outputs["Texture Fac"], mix.inputs['Fac'])
+    links.new(color_tex.outputs['Color'], mix.inputs['Color1'])
+    links.new(age_color.outputs['Color'], mix.inputs['Color2'])
+    links.new(mix.outputs['Color'], group_output.inputs["Color"])
+    
+    # 法线贴图
+    if concrete_texture.get('normal'):
+        normal_tex = nodes.new(type='ShaderNodeTexImage')
+        normal_tex.image = _get_image(concrete_texture['normal'], non_color=True)
+        links.new(mapping.outputs['Vector'], normal_tex.inputs['Vector'])
+        
+        normal_map = nodes.new(type='ShaderNodeNormalMap')
+        links.new(normal_tex.outputs['Color'], normal_map.inputs['Color'])
+        links.new(normal_map.outputs['Normal'], group_output.inputs["Normal"])
+    
+    # 粗糙度（无粗糙度贴图时使用按老化程度混合的数值）
+    if concrete_texture.get('roughness'):
+        rough_tex = nodes.new(type='ShaderNodeTexImage')
+        rough_tex.image = _get_image(concrete_texture['roughness'], non_color=True)
+        links.new(mapping.outputs['Vector'], rough_tex.inputs['Vector'])
+        links.new(rough_tex.outputs['Color'], group_output.inputs["Roughness"])
+    else:
+        links.new(age_roughness.outputs["Result"], group_output.inputs["Roughness"])
+    
+    return group
+
+
+def _build_concrete_material(
+    name: str,
+    asset_path: Optional[str],
+    new_color: Tuple[float, float, float, float],
+    aged_color: Tuple[float, float, float, float],
+    new_roughness: float,
+    aged_roughness: float,
+    texture_fac: float,
+    texture_scale: float,
+    use_roughness_map: bool = True,
+    spiral_marks: bool = False
+) -> bproc.types.Material:
+    """
+    获取（或创建并缓存）引用共享混凝土节点组的薄包装材质。
+    
+    PHC 桩和灌注桩都通过这里取材质；相同参数（含是否有纹理）只创建一次，贴图经 _get_image 按绝对路径去重。
+    
+    :param name: 材质名称（仅首次创建时使用）
+    :param asset_path: 资产路径（用于加载混凝土纹理），无纹理时使用纯色
+    :param new_color: 新桩颜色 RGBA
+    :param aged_color: 陈旧桩颜色 RGBA
+    :param new_roughness: 新桩粗糙度（无粗糙度贴图时）
+    :param aged_roughness: 陈旧桩粗糙度（无粗糙度贴图时）
+    :param texture_fac: 纹理与基础色的混合比例
+    :param texture_scale: 纹理坐标缩放
+    :param use_roughness_map: 是否使用节点组输出的粗糙度，否则固定为 new_roughness
+    :param spiral_marks: 是否用凹凸节点叠加螺旋模具痕迹（纸筒模具特征）
+    :return: 材质
+    """
+    import blenderproc as bproc
+    
+    concrete_texture = load_concrete_texture(asset_path, print_found=False)
+    if not (concrete_texture and concrete_texture.get('color')):
+        concrete_texture = None
+    key = ("concrete", concrete_texture is not None, new_color, aged_color, new_roughness, aged_roughness,
+           texture_fac, texture_scale, use_roughness_map, spiral_marks)
+    material = _MATERIAL_TEMPLATE_CACHE.get(key)
+    if material is not None:
+        return material
+    
+    material = bproc.material.create(name)
+    group_node = material.new_node("ShaderNodeGroup")
+    group_node.node_tree = _build_concrete_nodegroup(concrete_texture)
+    group_node.inputs["New Color"].default_value = new_color
+    group_node.inputs["Aged Color"].default_value = aged_color
+    group_node.inputs["New Roughness"].default_value = new_roughness
+    group_node.inputs["Aged Roughness"].default_value = aged_roughness
+    group_node.inputs["Texture Fac"].default_value = texture_fac
+    group_node.inputs["Texture Scale"].default_value = (texture_scale, texture_scale, texture_scale)
+    
+    material.set_principled_shader_value("Base Color", group_node.outputs["Color"])
+    if use_roughness_map:
+        material.set_principled_shader_value("Roughness", group_node.outputs["Roughness"])
+    else:
+        material.set_principled_shader_value("Roughness", new_roughness)
+    normal_socket = None
+    if concrete_texture and concrete_texture.get('normal'):
+        normal_socket = group_node.outputs["Normal"]
+    
+    if spiral_marks:
+        # 螺旋痕迹：相位 = 2π·f·z + atan2(y, x)，取正弦作为凹凸高度，得到螺距为 1/f 的单线螺旋
+        tex_coord = material.new_node("ShaderNodeTexCoord")
+        separate = material.new_node("ShaderNodeSeparateXYZ")
+        material.link(tex_coord.outputs["Object"], separate.inputs["Vector"])
+        
+        angle = material.new_node("ShaderNodeMath")
+        angle.operation = 'ARCTAN2'
+        material.link(separate.outputs["Y"], angle.inputs[0])
+        material.link(separate.outputs["X"], angle.inputs[1])
+        
+        # 桩身网格为单位高度（见 _instance_pile_body），对象坐标 Z 乘以桩身长度才是米
+        length = material.new_node("ShaderNodeAttribute")
+        length.attribute_type = 'OBJECT'
+        length.attribute_name = PILE_LENGTH_PROPERTY
+        z_meters = material.new_node("ShaderNodeMath")
+        z_meters.operation = 'MULTIPLY'
+        material.link(separate.outputs["Z"], z_meters.inputs[0])
+        material.link(length.outputs["Fac"], z_meters.inputs[1])
+        
+        phase = material.new_node("ShaderNodeMath")
+        phase.operation = 'MULTIPLY_ADD'
+        material.link(z_meters.outputs["Value"], phase.inputs[0])
+        phase.inputs[1].default_value = 2.0 * np.pi * SPIRAL_MARK_TURNS_PER_METER
+        material.link(angle.outputs["Value"], phase.inputs[2])
+        
+        height = material.new_node("ShaderNodeMath")
+        height.operation = 'SINE'
+        material.link(phase.outputs["Value"], height.inputs[0])
+        
+        bump = material.new_node("ShaderNodeBump")
+        bump.inputs["Strength"].default_value = 0.3
+        bump.inputs["Distance"].default_value = 0.003
+        material.link(height.outputs["Value"], bump.inputs["Height"])
+        if normal_socket is not None:
+            material.link(normal_socket, bump.inputs["Normal"])
+        normal_socket = bump.outputs["Normal"]
+    
+    if normal_socket is not None:
+        material.set_principled_shader_value("Normal", normal_socket)
+    material.set_principled_shader_value("Metallic", 0.0)
+    _MATERIAL_TEMPLATE_CACHE[key] = material
+    return material
+
+
+def _apply_metal(
+    material: bproc.types.Material,
+    base_color: Tuple[float, float, float, float],
+    metallic: float,
+    roughness: float
+) -> None:
+    """
+    只查找一次 Principled BSDF，直接写入颜色、金属度和粗糙度。
+    
+    :param material: 材质
+    :param base_color: 基础颜色 RGBA
+    :param metallic: 金属度
+    :param roughness: 粗糙度
+    """
+    principled_bsdf = material.get_the_one_node_with_type("BsdfPrincipled")
+    principled_bsdf.inputs["Base Color"].default_value = base_color
+    principled_bsdf.inputs["Metallic"].default_value = metallic
+    principled_bsdf.inputs["Roughness"].default_value = roughness
+
+
+def _get_metal_material(
+    key: tuple,
+    name: str,
+    base_color: Tuple[float, float, float, float],
+    metallic: float,
+    roughness: float
+) -> bproc.types.Material:
+    """
+    获取（或创建并缓存）金属材质。
+    
+    :param key: 材质缓存键
+    :param name: 材质名称
+    :param base_color: 基础颜色 RGBA
+    :param metallic: 金属度
+    :param roughness: 粗糙度
+    :return: 材质
+    """
+    import blenderproc as bproc
+    
+    material = _MATERIAL_TEMPLATE_CACHE.get(key)
+    if material is None:
+        material = bproc.material.create(name)
+        _apply_metal(material, base_color, metallic, roughness)
+        _MATERIAL_TEMPLATE_CACHE[key] = material
+    return material
 
 
 def create_phc_pile(
@@ -91,147 +778,60 @@ def create_phc_pile(
     :param asset_path: 资产路径（用于加载混凝土纹理）
     :return: (主桩对象, 抱箍对象或None)
     """
+    import bpy
+    
     # 转换为米
     outer_radius = (diameter / 1000.0) / 2.0
     wall_thickness = 0.07  # 70mm壁厚
     inner_radius = outer_radius - wall_thickness
+    assert inner_radius > 0, f"PHC wall thickness {wall_thickness}m too large for diameter {diameter}mm"
     
     # 总高度：入土深度 + 露出高度（假设入土1.5m，可根据需要调整）
     total_height = 1.5 + exposed_height
     
-    # 创建空心圆柱（外圆柱减去内圆柱）
-    # 方法：创建外圆柱，然后使用布尔修改器减去内圆柱
-    outer_cylinder = bproc.object.create_primitive(
-        "CYLINDER",
-        radius=outer_radius,
-        depth=total_height
+    # 混凝土材质：所有PHC桩共享同一材质，新/旧状态由对象属性在节点组内切换（参考报告表）
+    pile_material = _build_concrete_material(
+        "phc_pile_material",
+        asset_path,
+        new_color=(0.78, 0.78, 0.78, 1.0),  # 新桩：灰白色(200, 200, 200)
+        aged_color=(0.47, 0.47, 0.47, 1.0),  # 陈旧桩：深灰(120, 120, 120)，有裂纹
+        new_roughness=0.3,  # 光滑，模板印痕
+        aged_roughness=0.7,  # 粗糙，风化
+        texture_fac=0.7,  # 70%纹理，30%基础色
+        texture_scale=2.0
     )
     
-    # 创建内圆柱（用于布尔运算）
-    inner_cylinder = bproc.object.create_primitive(
-        "CYLINDER",
-        radius=inner_radius,
-        depth=total_height * 1.1  # 稍长以确保完全切除
+    # 创建空心圆柱：直接生成管状网格（内外圆周面 + 上下环形端面），无需布尔运算；同直径的桩共享网格
+    outer_cylinder = _instance_pile_body(
+        "phc_pile",
+        _build_tube_mesh, (outer_radius, inner_radius),
+        total_height,
+        pile_material
     )
-    inner_cylinder.set_location(location)
-    inner_cylinder.blender_obj.hide_render = True
-    inner_cylinder.blender_obj.hide_set(True)
+    outer_cylinder.blender_obj[PILE_AGE_PROPERTY] = 0.0 if age_state == "new" else 1.0
     
-    # 设置外圆柱位置（底部在location的z）
+    # 设置位置（底部在location的z）
     outer_cylinder.set_location([
         location[0],
         location[1],
         location[2] + total_height / 2.0
     ])
     
-    # 使用布尔修改器创建空心
-    try:
-        bpy.context.view_layer.objects.active = outer_cylinder.blender_obj
-        bpy.ops.object.modifier_add(type='BOOLEAN')
-        outer_cylinder.blender_obj.modifiers[-1].name = "Hollow"
-        outer_cylinder.blender_obj.modifiers[-1].operation = 'DIFFERENCE'
-        outer_cylinder.blender_obj.modifiers[-1].object = inner_cylinder.blender_obj
-        bpy.ops.object.modifier_apply(modifier="Hollow")
-    except Exception as e:
-        print(f"Warning: Could not create hollow cylinder for PHC pile: {e}")
-        # 如果布尔失败，使用实心圆柱作为后备
-        pass
-    
-    # 删除内圆柱（不再需要）
-    bpy.data.objects.remove(inner_cylinder.blender_obj, do_unlink=True)
-    
-    outer_cylinder.blender_obj.hide_set(False)
-    outer_cylinder.blender_obj.hide_render = False
-    outer_cylinder.add_uv_mapping("smart")
-    
-    # 创建混凝土材质
-    pile_material = outer_cylinder.new_material("phc_pile_material")
-    nodes = pile_material.blender_obj.node_tree.nodes
-    links = pile_material.blender_obj.node_tree.links
-    principled_bsdf = Utility.get_the_one_node_with_type(nodes, "BsdfPrincipled")
-    
-    # 根据老化状态设置颜色（参考报告表）
-    if age_state == "new":
-        # 新桩：灰白色(200, 200, 200)
-        base_color = (0.78, 0.78, 0.78, 1.0)  # RGB 200/255
-        roughness = 0.3  # 光滑，模板印痕
-    else:
-        # 陈旧桩：深灰(120, 120, 120)，有裂纹
-        base_color = (0.47, 0.47, 0.47, 1.0)  # RGB 120/255
-        roughness = 0.7  # 粗糙，风化
-    
-    # 尝试加载混凝土纹理
-    concrete_texture = load_concrete_texture(asset_path, print_found=False)
-    
-    if concrete_texture and concrete_texture.get('color'):
-        # 使用纹理
-        tex_coord = nodes.new(type='ShaderNodeTexCoord')
-        mapping = nodes.new(type='ShaderNodeMapping')
-        mapping.inputs['Scale'].default_value = (2.0, 2.0, 2.0)
-        links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-        
-        color_tex = nodes.new(type='ShaderNodeTexImage')
-        color_tex.image = bpy.data.images.load(str(concrete_texture['color']))
-        links.new(mapping.outputs['Vector'], color_tex.inputs['Vector'])
-        
-        # 混合纹理和基础颜色
-        mix = nodes.new(type='ShaderNodeMixRGB')
-        mix.inputs['Fac'].default_value = 0.7  # 70%纹理，30%基础色
-        links.new(color_tex.outputs['Color'], mix.inputs['Color1'])
-        mix.inputs['Color2'].default_value = base_color
-        links.new(mix.outputs['Color'], principled_bsdf.inputs['Base Color'])
-        
-        # 添加法线贴图
-        if concrete_texture.get('normal'):
-            normal_tex = nodes.new(type='ShaderNodeTexImage')
-            normal_tex.image = bpy.data.images.load(str(concrete_texture['normal']))
-            normal_tex.image.colorspace_settings.name = 'Non-Color'
-            links.new(mapping.outputs['Vector'], normal_tex.inputs['Vector'])
-            
-            normal_map = nodes.new(type='ShaderNodeNormalMap')
-            links.new(normal_tex.outputs['Color'], normal_map.inputs['Color'])
-            links.new(normal_map.outputs['Normal'], principled_bsdf.inputs['Normal'])
-        
-        # 粗糙度
-        if concrete_texture.get('roughness'):
-            rough_tex = nodes.new(type='ShaderNodeTexImage')
-            rough_tex.image = bpy.data.images.load(str(concrete_texture['roughness']))
-            rough_tex.image.colorspace_settings.name = 'Non-Color'
-            links.new(mapping.outputs['Vector'], rough_tex.inputs['Vector'])
-            links.new(rough_tex.outputs['Color'], principled_bsdf.inputs['Roughness'])
-        else:
-            pile_material.set_principled_shader_value("Roughness", roughness)
-    else:
-        # 无纹理，使用纯色
-        pile_material.set_principled_shader_value("Base Color", base_color)
-        pile_material.set_principled_shader_value("Roughness", roughness)
-    
-    pile_material.set_principled_shader_value("Metallic", 0.0)
-    
     # 添加破碎顶面（如果启用）
     if has_cracked_top:
         # 在顶部添加不规则的粗糙面
         # 使用细分和随机顶点位移模拟
-        try:
-            bpy.context.view_layer.objects.active = outer_cylinder.blender_obj
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='DESELECT')
-            
-            # 选择顶部面
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.mode_set(mode='EDIT')
-            bpy.ops.mesh.select_all(action='DESELECT')
-            
-            # 使用修改器添加噪声
-            bpy.ops.object.mode_set(mode='OBJECT')
-            bpy.ops.object.modifier_add(type='DISPLACE')
-            noise_tex = bpy.data.textures.new(name="CrackNoise", type='CLOUDS')
-            noise_tex.noise_scale = 0.1
-            outer_cylinder.blender_obj.modifiers[-1].texture = noise_tex
-            outer_cylinder.blender_obj.modifiers[-1].strength = 0.02  # 轻微位移
-            outer_cylinder.blender_obj.modifiers[-1].mid_level = 0.5
-        except Exception as e:
-            print(f"Warning: Could not add cracked top: {e}")
+        # 使用修改器添加噪声（置换修改器不依赖选择，无需进入编辑模式）
+        # 桩身带 Z 缩放：噪声取世界坐标、沿世界 Z 位移，位移量和纹理尺度都不随桩身长度拉伸
+        displace = outer_cylinder.blender_obj.modifiers.new("CrackNoise", 'DISPLACE')
+        noise_tex = bpy.data.textures.new(name="CrackNoise", type='CLOUDS')
+        noise_tex.noise_scale = 0.1
+        displace.texture = noise_tex
+        displace.texture_coords = 'GLOBAL'
+        displace.direction = 'Z'
+        displace.space = 'GLOBAL'
+        displace.strength = 0.02  # 轻微位移
+        displace.mid_level = 0.5
     
     # 创建抱箍（如果启用）
     hoop_obj = None
@@ -240,10 +840,14 @@ def create_phc_pile(
         hoop_height = 0.05  # 5cm高
         hoop_radius = outer_radius + 0.01  # 略大于桩半径
         
-        hoop = bproc.object.create_primitive(
-            "CYLINDER",
-            radius=hoop_radius,
-            depth=hoop_height
+        # 金属材质（镀锌钢，银灰色），所有抱箍共享
+        hoop_material = _get_metal_material(
+            ("hoop_clamp",), "hoop_clamp_material", (0.7, 0.7, 0.75, 1.0), 0.9, 0.2
+        )
+        hoop = _instance_mesh_object(
+            "hoop_clamp",
+            _build_cylinder_mesh, (hoop_radius, hoop_height),
+            hoop_material
         )
         hoop.set_location([
             location[0],
@@ -251,14 +855,6 @@ def create_phc_pile(
             location[2] + total_height - hoop_height / 2.0  # 在顶部
         ])
         
-        # 金属材质（镀锌钢）
-        hoop_material = hoop.new_material("hoop_clamp_material")
-        hoop_material.set_principled_shader_value("Base Color", (0.7, 0.7, 0.75, 1.0))  # 银灰色
-        hoop_material.set_principled_shader_value("Metallic", 0.9)
-        hoop_material.set_principled_shader_value("Roughness", 0.2)
-        
-        hoop.blender_obj.hide_set(False)
-        hoop.blender_obj.hide_render = False
         hoop.set_cp("category_id", 0)  # 与桩相同类别
         hoop_obj = hoop
     
@@ -290,106 +886,86 @@ def create_spiral_steel_pile(
     :param asset_path: 资产路径
     :return: (钢管对象, 法兰盘对象)
     """
+    import blenderproc as bproc
+    
     # 转换为米
     pipe_radius = (pipe_diameter / 1000.0) / 2.0
     wall_thickness = 0.004  # 4mm壁厚
     
+    # 热镀锌钢材质（根据锈蚀程度）
+    if rust_level == "new":
+        # 新桩：银灰金属光泽(180, 180, 180)
+        base_color = (0.71, 0.71, 0.71, 1.0)
+        metallic = 0.95
+        roughness = 0.1  # 高光泽
+    elif rust_level == "light":
+        # 3-6月：浅灰(160, 160, 160)，镀锌层轻微氧化
+        base_color = (0.63, 0.63, 0.63, 1.0)
+        metallic = 0.85
+        roughness = 0.2
+    elif rust_level == "medium":
+        # 1-2年：锈蚀初期(139, 90, 43)，局部红褐色锈斑
+        base_color = (0.55, 0.35, 0.17, 1.0)
+        metallic = 0.6
+        roughness = 0.5
+    else:  # heavy
+        # 2年+：深锈色(100, 60, 30)，镀锌层大面积失效
+        base_color = (0.39, 0.24, 0.12, 1.0)
+        metallic = 0.3
+        roughness = 0.8
+    
+    # 钢管、螺旋环和法兰盘共用一个材质（同锈蚀程度的桩之间也共享），各部件网格按规格共享
+    steel_material = _get_metal_material(
+        ("spiral_steel", rust_level), "spiral_steel_material", base_color, metallic, roughness
+    )
+    
     # 创建钢管（实心圆柱，后续可改为空心）
-    pipe = bproc.object.create_primitive(
-        "CYLINDER",
-        radius=pipe_radius,
-        depth=total_length
+    pipe = _instance_pile_body(
+        "spiral_steel_pipe",
+        _build_cylinder_mesh, (pipe_radius,),
+        total_length,
+        steel_material
     )
     pipe.set_location([
         location[0],
         location[1],
         location[2] + total_length / 2.0
     ])
-    pipe.blender_obj.hide_set(False)
-    pipe.blender_obj.hide_render = False
-    pipe.add_uv_mapping("smart")
     
     # 创建螺旋叶片（简化：使用环形几何体）
     # 实际螺旋叶片需要更复杂的建模，这里用环形代替
     spiral_outer_radius = pipe_radius * 4.0  # 叶片外径约为管径的4倍
     spiral_thickness = 0.005  # 5mm厚
     
-    # 创建多个螺旋环（1.5-3圈）
+    # 创建多个螺旋环（1.5-3圈），所有环共享同一个圆环网格（linked duplicate），只是位置不同
     num_rings = 2
-    spiral_rings = []
     for i in range(num_rings):
-        ring = bproc.object.create_primitive(
-            "TORUS",
-            major_radius=spiral_outer_radius,
-            minor_radius=spiral_thickness / 2.0
+        ring = _instance_mesh_object(
+            f"spiral_ring_{i}",
+            _build_torus_mesh, (spiral_outer_radius, spiral_thickness / 2.0),
+            steel_material
         )
         ring_height = (i + 0.5) * (total_length / num_rings)
         ring.set_location([
             location[0],
             location[1],
             location[2] + ring_height
-        ])
-        ring.set_rotation_euler([np.pi / 2, 0, 0])  # 旋转为水平
-        ring.blender_obj.hide_set(False)
-        ring.blender_obj.hide_render = False
-        spiral_rings.append(ring)
+        ])  # 圆环网格本身位于XY平面（水平），无需旋转
+        ring.set_cp("category_id", 0)
     
     # 创建法兰盘（顶部）
     flange_diameter = 0.22  # 220mm
     flange_thickness = 0.01  # 10mm
-    flange = bproc.object.create_primitive(
-        "CYLINDER",
-        radius=flange_diameter / 2.0,
-        depth=flange_thickness
+    flange = _instance_mesh_object(
+        "flange",
+        _build_cylinder_mesh, (flange_diameter / 2.0, flange_thickness),
+        steel_material
     )
     flange.set_location([
         location[0],
         location[1],
         location[2] + total_length - flange_thickness / 2.0
     ])
-    flange.blender_obj.hide_set(False)
-    flange.blender_obj.hide_render = False
-    
-    # 热镀锌钢材质（根据锈蚀程度）
-    if rust_level == "new":
-        # 新桩：银灰金属光泽(180, 180, 180)
-        base_color = (0.71, 0.71, 0.71, 1.0)
-        metallic = 0.95
-        roughness = 0.1  # 高光泽
-    elif rust_level == "light":
-        # 3-6月：浅灰(160, 160, 160)，镀锌层轻微氧化
-        base_color = (0.63, 0.63, 0.63, 1.0)
-        metallic = 0.85
-        roughness = 0.2
-    elif rust_level == "medium":
-        # 1-2年：锈蚀初期(139, 90, 43)，局部红褐色锈斑
-        base_color = (0.55, 0.35, 0.17, 1.0)
-        metallic = 0.6
-        roughness = 0.5
-    else:  # heavy
-        # 2年+：深锈色(100, 60, 30)，镀锌层大面积失效
-        base_color = (0.39, 0.24, 0.12, 1.0)
-        metallic = 0.3
-        roughness = 0.8
-    
-    # 钢管材质
-    pipe_material = pipe.new_material("spiral_steel_pipe_material")
-    pipe_material.set_principled_shader_value("Base Color", base_color)
-    pipe_material.set_principled_shader_value("Metallic", metallic)
-    pipe_material.set_principled_shader_value("Roughness", roughness)
-    
-    # 螺旋环和法兰盘使用相同材质
-    for ring in spiral_rings:
-        ring_material = ring.new_material("spiral_ring_material")
-        ring_material.set_principled_shader_value("Base Color", base_color)
-        ring_material.set_principled_shader_value("Metallic", metallic)
-        ring_material.set_principled_shader_value("Roughness", roughness)
-        ring.set_cp("category_id", 0)
-    
-    flange_material = flange.new_material("flange_material")
-    flange_material.set_principled_shader_value("Base Color", base_color)
-    flange_material.set_principled_shader_value("Metallic", metallic)
-    flange_material.set_principled_shader_value("Roughness", roughness)
     
     pipe.set_cp("category_id", 0)
     flange.set_cp("category_id", 0)
@@ -405,7 +981,8 @@ def create_cast_in_place_pile(
     exposed_height: float = 0.3,
     has_spiral_marks: bool = True,
     has_leakage: bool = False,
-    asset_path: Optional[str] = None
+    asset_path: Optional[str] = None,
+    leakage_params: Optional[np.ndarray] = None
 ) -> bproc.types.MeshObject:
     """
     创建灌注桩。
@@ -420,112 +997,65 @@ def create_cast_in_place_pile(
     :param has_spiral_marks: 是否包含螺旋模具痕迹
     :param has_leakage: 是否在底部有漏浆结块
     :param asset_path: 资产路径
+    :param leakage_params: 预先抽取的漏浆参数 [dx, dy, sx, sy, sz]（见 draw_leakage_params），None 则现场抽取
     :return: 桩对象
     """
+    import blenderproc as bproc
+    
     radius = diameter / 2.0
     
-    # 创建主桩体
-    pile = bproc.object.create_primitive(
-        "CYLINDER",
-        radius=radius,
-        depth=total_length
+    # 混凝土材质（C30，新浇筑灰白色(210, 210, 210)），所有灌注桩共享；螺旋模具痕迹在着色器中生成
+    pile_material = _build_concrete_material(
+        "cast_in_place_pile_material",
+        asset_path,
+        new_color=(0.82, 0.82, 0.82, 1.0),
+        aged_color=(0.82, 0.82, 0.82, 1.0),
+        new_roughness=0.6,
+        aged_roughness=0.6,
+        texture_fac=0.6,
+        texture_scale=3.0,  # 螺旋纹理需要更细的缩放
+        use_roughness_map=False,
+        spiral_marks=has_spiral_marks
+    )
+    
+    # 创建主桩体（同直径的桩共享网格）
+    pile = _instance_pile_body(
+        "cast_in_place_pile",
+        _build_cylinder_mesh, (radius,),
+        total_length,
+        pile_material
     )
     pile.set_location([
         location[0],
         location[1],
         location[2] + total_length / 2.0
     ])
-    pile.blender_obj.hide_set(False)
-    pile.blender_obj.hide_render = False
-    pile.add_uv_mapping("smart")
-    
-    # 添加螺旋模具痕迹（使用修改器）
-    if has_spiral_marks:
-        try:
-            bpy.context.view_layer.objects.active = pile.blender_obj
-            # 使用数组修改器创建螺旋效果
-            bpy.ops.object.modifier_add(type='ARRAY')
-            # 或者使用纹理坐标创建螺旋纹理
-            # 这里简化：使用法线贴图模拟螺旋痕迹
-        except Exception as e:
-            print(f"Warning: Could not add spiral marks: {e}")
     
     # 添加漏浆结块（底部不规则扩径）
     if has_leakage:
-        try:
-            # 在底部创建不规则的结块
-            leakage = bproc.object.create_primitive(
-                "ICOSPHERE",
-                subdivisions=2,
-                radius=radius * 1.3  # 略大于桩径
-            )
-            # 随机缩放和变形
-            leakage.set_location([
-                location[0] + np.random.uniform(-0.05, 0.05),
-                location[1] + np.random.uniform(-0.05, 0.05),
-                location[2] + 0.1  # 在底部
-            ])
-            leakage.set_scale([
-                np.random.uniform(0.8, 1.2),
-                np.random.uniform(0.8, 1.2),
-                np.random.uniform(0.5, 0.8)
-            ])
-            leakage.blender_obj.hide_set(False)
-            leakage.blender_obj.hide_render = False
-            
-            # 漏浆材质（深色混凝土）
-            leakage_material = leakage.new_material("leakage_material")
-            leakage_material.set_principled_shader_value("Base Color", (0.3, 0.3, 0.3, 1.0))
-            leakage_material.set_principled_shader_value("Roughness", 0.9)
-            leakage_material.set_principled_shader_value("Metallic", 0.0)
-            leakage.set_cp("category_id", 0)  # 与桩相同
-        except Exception as e:
-            print(f"Warning: Could not add leakage: {e}")
-    
-    # 混凝土材质（C30，新浇筑灰白色）
-    pile_material = pile.new_material("cast_in_place_pile_material")
-    nodes = pile_material.blender_obj.node_tree.nodes
-    links = pile_material.blender_obj.node_tree.links
-    principled_bsdf = Utility.get_the_one_node_with_type(nodes, "BsdfPrincipled")
-    
-    # 新浇筑：灰白色(210, 210, 210)
-    base_color = (0.82, 0.82, 0.82, 1.0)
-    
-    # 尝试加载混凝土纹理
-    concrete_texture = load_concrete_texture(asset_path, print_found=False)
-    
-    if concrete_texture and concrete_texture.get('color'):
-        tex_coord = nodes.new(type='ShaderNodeTexCoord')
-        mapping = nodes.new(type='ShaderNodeMapping')
-        mapping.inputs['Scale'].default_value = (3.0, 3.0, 3.0)  # 螺旋纹理需要更细的缩放
-        links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-        
-        color_tex = nodes.new(type='ShaderNodeTexImage')
-        color_tex.image = bpy.data.images.load(str(concrete_texture['color']))
-        links.new(mapping.outputs['Vector'], color_tex.inputs['Vector'])
-        
-        # 混合
-        mix = nodes.new(type='ShaderNodeMixRGB')
-        mix.inputs['Fac'].default_value = 0.6
-        links.new(color_tex.outputs['Color'], mix.inputs['Color1'])
-        mix.inputs['Color2'].default_value = base_color
-        links.new(mix.outputs['Color'], principled_bsdf.inputs['Base Color'])
+        # 在底部创建不规则的结块
+        leakage = bproc.object.create_primitive(
+            "ICO_SPHERE",
+            subdivisions=2,
+            radius=radius * 1.3  # 略大于桩径
+        )
+        # 随机缩放和变形（偏移和缩放一次抽取）
+        if leakage_params is None:
+            leakage_params = draw_leakage_params(1)[0]
+        dx, dy, sx, sy, sz = leakage_params
+        leakage.set_location([
+            location[0] + dx,
+            location[1] + dy,
+            location[2] + 0.1  # 在底部
+        ])
+        leakage.set_scale([sx, sy, sz])
         
-        # 法线贴图（模拟螺旋痕迹）
-        if concrete_texture.get('normal'):
-            normal_tex = nodes.new(type='ShaderNodeTexImage')
-            normal_tex.image = bpy.data.images.load(str(concrete_texture['normal']))
-            normal_tex.image.colorspace_settings.name = 'Non-Color'
-            links.new(mapping.outputs['Vector'], normal_tex.inputs['Vector'])
-            
-            normal_map = nodes.new(type='ShaderNodeNormalMap')
-            links.new(normal_tex.outputs['Color'], normal_map.inputs['Color'])
-            links.new(normal_map.outputs['Normal'], principled_bsdf.inputs['Normal'])
-    else:
-        pile_material.set_principled_shader_value("Base Color", base_color)
-    
-    pile_material.set_principled_shader_value("Roughness", 0.6)
-    pile_material.set_principled_shader_value("Metallic", 0.0)
+        # 漏浆材质（深色混凝土）
+        leakage_material = leakage.new_material("leakage_material")
+        leakage_material.set_principled_shader_value("Base Color", (0.3, 0.3, 0.3, 1.0))
+        leakage_material.set_principled_shader_value("Roughness", 0.9)
+        leakage_material.set_principled_shader_value("Metallic", 0.0)
+        leakage.set_cp("category_id", 0)  # 与桩相同
     
     pile.set_cp("category_id", 0)
     pile.set_name("CastInPlacePile_300mm")
@@ -591,6 +1121,7 @@ def create_pile_variant(
         has_spiral = kwargs.get('has_spiral_marks', True)
         has_leakage = kwargs.get('has_leakage', False)
         asset_path = kwargs.get('asset_path')
+        leakage_params = kwargs.get('leakage_params')
         
         pile = create_cast_in_place_pile(
             final_location,
@@ -599,10 +1130,48 @@ def create_pile_variant(
             exposed_height=exposed_height,
             has_spiral_marks=has_spiral,
             has_leakage=has_leakage,
-            asset_path=asset_path
+            asset_path=asset_path,
+            leakage_params=leakage_params
         )
         return pile, None
     
     else:
         raise ValueError(f"Unknown pile type: {pile_type}")
 
+
+def create_pile_batch(
+    pile_specs: List[dict]
+) -> List[Tuple[bproc.types.MeshObject, Optional[bproc.types.MeshObject]]]:
+    """
+    批量创建桩基，摊销逐根创建时的 Blender 状态切换开销。
+    
+    按桩型排序后连续创建（网格数组和材质缓存连续命中），漏浆参数一次抽取，
+    最后只触发一次视图层更新。
+    
+    :param pile_specs: 桩描述列表（与 layout_piles_with_constraints 的输出格式一致），每项包含
+                       'pile_type'、'position'（[x, y]）、'terrain_z'，可选 'pile_params'（传给 create_pile_variant）和 'tilt'
+    :return: 与 pile_specs 顺序一致的 (主桩对象, 附件对象或None) 列表
+    """
+    import bpy
+    
+    order = sorted(range(len(pile_specs)), key=lambda k: pile_specs[k]['pile_type'])
+    leakage_params = draw_leakage_params(len(pile_specs))
+    results: List[Optional[Tuple[bproc.types.MeshObject, Optional[bproc.types.MeshObject]]]] = [None] * len(pile_specs)
+    
+    for k in order:
+        spec = pile_specs[k]
+        pile_params = dict(spec.get('pile_params', {}))
+        pile_params.setdefault('leakage_params', leakage_params[k])
+        pile_obj, attachment = create_pile_variant(
+            pile_type=spec['pile_type'],
+            location=spec['position'],
+            terrain_z=spec['terrain_z'],
+            **pile_params
+        )
+        # 施工误差导致的倾斜
+        if 'tilt' in spec:
+            pile_obj.set_rotation_euler(spec['tilt'])
+        results[k] = (pile_obj, attachment)
+    
+    bpy.context.view_layer.update()
+    return results
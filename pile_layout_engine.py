@@ -8,50 +8,310 @@ Constraint-based Pile Layout Engine
 - 报告5.2节：随坡与阶梯逻辑
 """
 
+from __future__ import annotations
+
 import numpy as np
-import blenderproc as bproc
-from typing import List, Tuple, Optional, Dict
+from typing import TYPE_CHECKING, List, Tuple, Optional, Dict
+import functools
 import math
 
+# 可选：numba 编译的桩组放置内核（有预计算地形网格时使用；未安装时回退到 NumPy）
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# blenderproc / mathutils 只在访问地形时才需要，延迟到函数内部导入，纯数组部分（采样、网格插值、内核）无需 Blender 即可导入
+if TYPE_CHECKING:
+    import blenderproc as bproc
+    from mathutils.bvhtree import BVHTree
+
+
+# 地形 BVH 缓存（按地形对象名称）：地形在排布期间是静态的，只需构建一次
+_TERRAIN_BVH_CACHE: Dict[str, BVHTree] = {}
+# 模块级随机数生成器（首次使用时由全局 np.random 状态派生种子，保证 np.random.seed 仍可复现）
+_RNG: Optional[np.random.Generator] = None
+# 行方向角度的量化档数（2π/1024 ≈ 0.35°），旋转矩阵按档缓存
+_ROTATION_BINS = 1024
+
+
+def _get_rng() -> np.random.Generator:
+    """
+    获取模块级随机数生成器。
+    
+    :return: 随机数生成器
+    """
+    global _RNG
+    if _RNG is None:
+        _RNG = np.random.default_rng(np.random.randint(0, 2**31 - 1))
+    return _RNG
+
+
+@functools.lru_cache(maxsize=_ROTATION_BINS)
+def _rotmat(bin_idx: int) -> np.ndarray:
+    """
+    按量化档位返回二维旋转矩阵（只读，缓存共享）。
+    
+    :param bin_idx: 角度档位（0 ~ _ROTATION_BINS-1）
+    :return: 2×2 旋转矩阵
+    """
+    a = bin_idx * (2 * math.pi / _ROTATION_BINS)
+    cos_a = math.cos(a)
+    sin_a = math.sin(a)
+    rotation_matrix = np.array([
+        [cos_a, -sin_a],
+        [sin_a, cos_a]
+    ])
+    rotation_matrix.setflags(write=False)
+    return rotation_matrix
+
+
+@functools.lru_cache(maxsize=32)
+def _local_grid(rows: int, cols: int) -> np.ndarray:
+    """
+    桩组局部网格的单位偏移（行优先：先遍历同一行的各列），乘以 (桩间距, 行间距) 即为局部坐标（只读，缓存共享）。
+    
+    :param rows: 行数
+    :param cols: 列数
+    :return: 形状 (rows*cols, 2) 的 [列偏移, 行偏移]
+    """
+    col_offsets, row_offsets = np.meshgrid(np.arange(cols) - cols / 2.0, np.arange(rows) - rows / 2.0)
+    grid = np.stack([col_offsets, row_offsets], axis=-1).reshape(-1, 2)
+    grid.setflags(write=False)
+    return grid
+
+
+def get_terrain_bvh(terrain: bproc.types.MeshObject, rebuild: bool = False) -> BVHTree:
+    """
+    获取地形的 BVH 树（世界坐标），首次调用时构建并缓存。
+    
+    地形起伏来自未应用的修改器（如 DISPLACE），因此从 depsgraph 求值后的网格构建，
+    而非 terrain.create_bvh_tree() 使用的原始网格（后者只是一个平面）。
+    
+    :param terrain: 地形对象
+    :param rebuild: 是否强制重新构建（地形网格、修改器或变换发生变化后使用）
+    :return: 地形 BVH 树
+    """
+    name = terrain.get_name()
+    if rebuild or name not in _TERRAIN_BVH_CACHE:
+        _TERRAIN_BVH_CACHE[name] = _build_evaluated_bvh(terrain.blender_obj)
+    return _TERRAIN_BVH_CACHE[name]
+
+
+def _build_evaluated_bvh(obj) -> BVHTree:
+    """
+    由对象求值后（含全部修改器）的网格构建世界坐标 BVH 树，并在对象中心与场景射线求交结果比对校验。
+    
+    :param obj: Blender 网格对象
+    :return: BVH 树
+    """
+    import bpy
+    import bmesh
+    from mathutils import Vector
+    from mathutils.bvhtree import BVHTree
+    
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    eval_obj = obj.evaluated_get(depsgraph)
+    matrix_world = eval_obj.matrix_world.copy()
+    mesh = eval_obj.to_mesh()
+    try:
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.transform(matrix_world)
+        bvh = BVHTree.FromBMesh(bm)
+        bm.free()
+    finally:
+        eval_obj.to_mesh_clear()
+    
+    # 独立校验：在地形中心由场景（depsgraph 求值结果）向下投射一条射线，与树的结果比较；
+    # 若树误由未应用修改器的原始网格构建，两者高度会不一致
+    bbox = [matrix_world @ Vector(corner) for corner in eval_obj.bound_box]
+    center_x = sum(corner.x for corner in bbox) / 8.0
+    center_y = sum(corner.y for corner in bbox) / 8.0
+    origin = Vector((center_x, center_y, max(corner.z for corner in bbox) + 1.0))
+    down = Vector((0.0, 0.0, -1.0))
+    hit, scene_location, _, _, hit_obj, _ = bpy.context.scene.ray_cast(depsgraph, origin, down)
+    if hit and hit_obj.original == obj:
+        tree_location = bvh.ray_cast(origin, down)[0]
+        if tree_location is None or abs(tree_location.z - scene_location.z) > 1e-3:
+            raise RuntimeError(f"Terrain BVH of '{obj.name}' does not match its evaluated geometry at "
+                               f"({center_x:.2f}, {center_y:.2f}): scene ray hits z={scene_location.z:.3f}, "
+                               f"BVH ray hits {'nothing' if tree_location is None else f'z={tree_location.z:.3f}'}")
+    return bvh
+
+
+def batch_ray_cast_down(xy: np.ndarray, bvh: BVHTree, start_z: float = 100.0) -> np.ndarray:
+    """
+    从上方批量向下投射射线，获取一组平面位置处的地形高度。
+    
+    射线直接在地形 BVH 上求交，不经过场景 depsgraph。
+    
+    :param xy: 平面坐标，形状 (N, 2)
+    :param bvh: 地形 BVH 树（见 get_terrain_bvh）
+    :param start_z: 射线起点高度（m）
+    :return: 地形高度，形状 (N,)；未命中处为 0
+    """
+    from mathutils import Vector
+    
+    down = Vector((0.0, 0.0, -1.0))
+    
+    heights = np.zeros(len(xy))
+    for i, (x, y) in enumerate(np.asarray(xy).tolist()):
+        location, _, _, _ = bvh.ray_cast(Vector((x, y, start_z)), down)
+        if location is not None:
+            heights[i] = location.z
+    return heights
+
+
+def _terrain_grid_points(area_size: float, res: float) -> int:
+    """
+    地形网格每条边上的节点数。
+    
+    :param area_size: 区域大小（m）
+    :param res: 网格分辨率（m）
+    :return: 节点数（网格共 n×n 个节点，即 n² 条射线）
+    """
+    return int(math.ceil(area_size / res)) + 1
+
+
+def precompute_terrain_grid(
+    terrain: bproc.types.MeshObject,
+    area_size: float,
+    res: float = 2.0,
+    bvh: Optional[BVHTree] = None
+) -> Dict:
+    """
+    将地形高度场一次性栅格化为规则网格，并预计算坡度和坡向。
+    
+    之后的坡度/高度查询变为数组索引，不再逐点投射射线；适合组数较多或在同一地形上多次排布的情况。
+    默认分辨率与 get_terrain_slope 的采样半径一致，此时网格节点上的中心差分与四点采样结果相同。
+    
+    :param terrain: 地形对象
+    :param area_size: 区域大小（m），网格覆盖 [-area_size/2, area_size/2]²
+    :param res: 网格分辨率（m）
+    :param bvh: 地形 BVH 树（为 None 时使用 get_terrain_bvh 的缓存）
+    :return: 网格字典 {'heights', 'slope_angle', 'slope_direction', 'origin', 'res'}，数组形状均为 (ny, nx)
+    """
+    if bvh is None:
+        bvh = get_terrain_bvh(terrain)
+    
+    origin = -area_size / 2.0
+    n = _terrain_grid_points(area_size, res)
+    coords = origin + np.arange(n) * res
+    xs, ys = np.meshgrid(coords, coords)
+    heights = batch_ray_cast_down(np.column_stack([xs.ravel(), ys.ravel()]), bvh)
+    heights = heights.reshape(n, n).astype(np.float32)
+    
+    # 中心差分梯度（axis 0 为 y，axis 1 为 x）
+    dz_dy, dz_dx = np.gradient(heights, res)
+    
+    return {
+        'heights': heights,
+        'slope_angle': np.arctan(np.hypot(dz_dx, dz_dy)),
+        'slope_direction': np.arctan2(dz_dy, dz_dx) + np.pi / 2.0,
+        'origin': origin,
+        'res': res,
+    }
+
+
+def sample_terrain_grid(terrain_grid: Dict, xy: np.ndarray) -> np.ndarray:
+    """
+    在预计算的地形网格上双线性插值高度（超出网格范围的点取边界值）。
+    
+    :param terrain_grid: precompute_terrain_grid 的返回值
+    :param xy: 平面坐标，形状 (N, 2)
+    :return: 地形高度，形状 (N,)
+    """
+    heights = terrain_grid['heights']
+    ny, nx = heights.shape
+    fx = np.clip((xy[:, 0] - terrain_grid['origin']) / terrain_grid['res'], 0, nx - 1)
+    fy = np.clip((xy[:, 1] - terrain_grid['origin']) / terrain_grid['res'], 0, ny - 1)
+    ix = np.minimum(fx.astype(np.intp), nx - 2)
+    iy = np.minimum(fy.astype(np.intp), ny - 2)
+    tx = fx - ix
+    ty = fy - iy
+    
+    bottom = heights[iy, ix] * (1 - tx) + heights[iy, ix + 1] * tx
+    top = heights[iy + 1, ix] * (1 - tx) + heights[iy + 1, ix + 1] * tx
+    return bottom * (1 - ty) + top * ty
+
+
+if NUMBA_AVAILABLE:
+    # 纯数组循环，不涉及 bpy；cache=True 将编译结果缓存到磁盘，避免每次启动重新编译
+    @njit(cache=True)
+    def _bilinear_jit(heights, origin, res, x, y):
+        ny, nx = heights.shape
+        fx = min(max((x - origin) / res, 0.0), nx - 1.0)
+        fy = min(max((y - origin) / res, 0.0), ny - 1.0)
+        ix = min(int(fx), nx - 2)
+        iy = min(int(fy), ny - 2)
+        tx = fx - ix
+        ty = fy - iy
+        bottom = heights[iy, ix] * (1 - tx) + heights[iy, ix + 1] * tx
+        top = heights[iy + 1, ix] * (1 - tx) + heights[iy + 1, ix + 1] * tx
+        return bottom * (1 - ty) + top * ty
+
+    @njit(cache=True, parallel=True)
+    def _place_groups_on_grid_jit(unit_grid, pile_spacings, row_spacing, rotations, centers, heights, origin, res,
+                                  out_xy, out_z):
+        # 各桩组互不依赖，按组并行；组内旋转、平移和网格高度插值融合为一次循环，不产生中间数组
+        for g in prange(centers.shape[0]):
+            cos_a = rotations[g, 0, 0]
+            sin_a = rotations[g, 1, 0]
+            for i in range(unit_grid.shape[0]):
+                local_x = unit_grid[i, 0] * pile_spacings[g]
+                local_y = unit_grid[i, 1] * row_spacing
+                x = centers[g, 0] + cos_a * local_x - sin_a * local_y
+                y = centers[g, 1] + sin_a * local_x + cos_a * local_y
+                out_xy[g, i, 0] = x
+                out_xy[g, i, 1] = y
+                out_z[g, i] = _bilinear_jit(heights, origin, res, x, y)
+
 
 def calculate_row_spacing(
-    slope_angle: float,
-    slope_direction: float,
+    slope_angle,
+    slope_direction,
     component_height: float = 2.278,  # 组件高度（m）
     min_spacing: float = 3.6,
     max_spacing: float = 4.7
-) -> float:
+):
     """
     根据地形坡度动态计算排间距（防遮挡逻辑）。
     
     参考GB 50797-2012：北坡间距大，南坡间距小
     
-    :param slope_angle: 坡度角（弧度，0=水平，正=上坡）
-    :param slope_direction: 坡向（弧度，0=北，π/2=东，π=南，3π/2=西）
+    支持标量或数组输入（按元素计算），可一次求出所有桩组的排间距。
+    
+    :param slope_angle: 坡度角（弧度，0=水平，正=上坡），标量或数组
+    :param slope_direction: 坡向（弧度，0=北，π/2=东，π=南，3π/2=西），标量或数组
     :param component_height: 组件高度（m）
     :param min_spacing: 最小排间距（m）
     :param max_spacing: 最大排间距（m）
-    :return: 计算得到的排间距（m）
+    :return: 计算得到的排间距（m），形状与输入一致
     """
     # 简化计算：如果坡向朝南（π），间距可以较小
     # 如果坡向朝北（0），间距需要较大以避免遮挡
+    base_spacing = (min_spacing + max_spacing) / 2.0
+    
+    if np.ndim(slope_angle) == 0 and np.ndim(slope_direction) == 0:
+        # 标量输入：同一公式用纯 Python 数学计算，避免 NumPy ufunc 对单个值的调度开销
+        direction_factor = 0.7 + abs(float(slope_direction) % (2 * math.pi) - math.pi) / math.pi * 0.3
+        slope_factor = 1.0 + abs(float(slope_angle)) * 0.2
+        return min(max_spacing, max(min_spacing, base_spacing * direction_factor * slope_factor))
     
     # 将坡向转换为0-2π范围
-    normalized_direction = slope_direction % (2 * np.pi)
+    normalized_direction = np.mod(slope_direction, 2 * math.pi)
     
     # 计算朝向因子：南坡（π附近）因子小，北坡（0或2π附近）因子大
-    if normalized_direction < np.pi:
-        # 0到π：从北到南
-        direction_factor = 1.0 - (normalized_direction / np.pi) * 0.3  # 北坡1.0，南坡0.7
-    else:
-        # π到2π：从南到北
-        direction_factor = 0.7 + ((normalized_direction - np.pi) / np.pi) * 0.3  # 南坡0.7，北坡1.0
+    # 0到π：从北到南，北坡1.0 → 南坡0.7；π到2π：从南到北，南坡0.7 → 北坡1.0
+    # 两段合并为到南向（π）距离的线性函数
+    direction_factor = 0.7 + np.abs(normalized_direction - math.pi) / math.pi * 0.3
     
     # 坡度影响：坡度越大，间距需要越大
-    slope_factor = 1.0 + abs(slope_angle) * 0.2  # 坡度每增加1弧度，间距增加20%
+    slope_factor = 1.0 + np.abs(slope_angle) * 0.2  # 坡度每增加1弧度，间距增加20%
     
     # 计算最终间距
-    base_spacing = (min_spacing + max_spacing) / 2.0
     spacing = base_spacing * direction_factor * slope_factor
     
     # 限制在范围内
@@ -61,46 +321,56 @@ def calculate_row_spacing(
 
 
 def get_terrain_slope(
-    x: float,
-    y: float,
+    x,
+    y,
     terrain: bproc.types.MeshObject,
-    sample_radius: float = 2.0
-) -> Tuple[float, float]:
+    sample_radius: float = 2.0,
+    bvh: Optional[BVHTree] = None,
+    terrain_grid: Optional[Dict] = None
+) -> Tuple:
     """
     获取指定位置的地形坡度和坡向。
     
-    :param x: X坐标
-    :param y: Y坐标
+    支持标量或数组输入：多个位置的四点采样射线合并为一批投射。
+    
+    :param x: X坐标（标量或数组）
+    :param y: Y坐标（标量或数组，形状与 x 一致）
     :param terrain: 地形对象
     :param sample_radius: 采样半径（用于计算局部坡度）
-    :return: (坡度角（弧度）, 坡向（弧度，0=北）)
-    """
-    # 采样周围点计算坡度
-    sample_points = [
-        (x - sample_radius, y),
-        (x + sample_radius, y),
-        (x, y - sample_radius),
-        (x, y + sample_radius),
-    ]
-    
-    # 使用ray cast获取高度
-    heights = []
-    for px, py in sample_points:
-        hit, location = bproc.object.scene_ray_cast(
-            [px, py, 100.0],  # 从上方100m开始
-            [0, 0, -1]  # 向下
-        )
-        if hit:
-            heights.append(location[2])
-        else:
-            heights.append(0.0)
+    :param bvh: 地形 BVH 树（为 None 时使用 get_terrain_bvh 的缓存）
+    :param terrain_grid: 预计算的地形网格（见 precompute_terrain_grid）；提供时直接查表，不投射射线
+    :return: (坡度角（弧度）, 坡向（弧度，0=北）)，形状与输入一致
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    if terrain_grid is not None:
+        ny, nx = terrain_grid['slope_angle'].shape
+        ix = np.clip(np.rint((x - terrain_grid['origin']) / terrain_grid['res']).astype(np.intp), 0, nx - 1)
+        iy = np.clip(np.rint((y - terrain_grid['origin']) / terrain_grid['res']).astype(np.intp), 0, ny - 1)
+        return terrain_grid['slope_angle'][iy, ix], terrain_grid['slope_direction'][iy, ix]
+    
+    # 采样周围点计算坡度：每个位置取 -x, +x, -y, +y 四个点
+    offsets = np.array([
+        (-sample_radius, 0.0),
+        (sample_radius, 0.0),
+        (0.0, -sample_radius),
+        (0.0, sample_radius),
+    ])
+    sample_points = (np.stack([x, y], axis=-1)[..., None, :] + offsets).reshape(-1, 2)
+    
+    if bvh is None:
+        bvh = get_terrain_bvh(terrain)
+    
+    # 使用ray cast获取高度（从上方100m向下），所有位置的采样点一批投射
+    heights = batch_ray_cast_down(sample_points, bvh).reshape(x.shape + (4,))
     
     # 计算梯度
-    dz_dx = (heights[1] - heights[0]) / (2 * sample_radius)
-    dz_dy = (heights[3] - heights[2]) / (2 * sample_radius)
+    dz_dx = (heights[..., 1] - heights[..., 0]) / (2 * sample_radius)
+    dz_dy = (heights[..., 3] - heights[..., 2]) / (2 * sample_radius)
     
     # 坡度角
-    slope_angle = np.arctan(np.sqrt(dz_dx**2 + dz_dy**2))
+    slope_angle = np.arctan(np.hypot(dz_dx, dz_dy))
     
     # 坡向（0=北，π/2=东，π=南，3π/2=西）
     slope_direction = np.arctan2(dz_dy, dz_dx) + np.pi / 2.0
@@ -115,8 +385,10 @@ def create_stepped_pile_group(
     num_piles: int = 10,
     pile_spacing: float = 3.6,
     vertical_tolerance: float = 0.04,  # 40mm同组桩顶标高差
-    exposed_height_range: Tuple[float, float] = (0.3, 1.0)
-) -> List[Tuple[np.ndarray, float]]:
+    exposed_height_range: Tuple[float, float] = (0.3, 1.0),
+    bvh: Optional[BVHTree] = None,
+    terrain_grid: Optional[Dict] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     创建阶梯状桩组（Table，约10根桩）。
     
@@ -129,80 +401,109 @@ def create_stepped_pile_group(
     :param pile_spacing: 桩间距（m）
     :param vertical_tolerance: 垂直容差（m，同组桩顶标高差≤40mm）
     :param exposed_height_range: 露出高度范围（m）
-    :return: [(位置, 地形高度), ...] 列表
+    :param bvh: 地形 BVH 树（为 None 时使用 get_terrain_bvh 的缓存）
+    :param terrain_grid: 预计算的地形网格（见 precompute_terrain_grid）；提供时插值得到高度，不投射射线
+    :return: (桩位 (N, 2), 地形高度 (N,), 露出高度 (N,))，均为连续的 float32 数组
+    """
+    positions, terrain_zs, exposed_heights = create_stepped_pile_groups(
+        terrain,
+        np.asarray(group_center, dtype=float)[None, :2],
+        [row_angle],
+        num_piles=num_piles,
+        pile_spacings=[pile_spacing],
+        exposed_height_range=exposed_height_range,
+        bvh=bvh,
+        terrain_grid=terrain_grid
+    )
+    return positions[0], terrain_zs[0], exposed_heights[0]
+
+
+def create_stepped_pile_groups(
+    terrain: bproc.types.MeshObject,
+    group_centers: np.ndarray,
+    row_angles: np.ndarray,
+    num_piles: int = 10,
+    pile_spacings: np.ndarray = 3.6,
+    exposed_height_range: Tuple[float, float] = (0.3, 1.0),
+    bvh: Optional[BVHTree] = None,
+    terrain_grid: Optional[Dict] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    pile_positions = []
+    一次创建多个阶梯状桩组（各组逻辑同 create_stepped_pile_group）。
+    
+    批处理：所有组的桩位一次旋转平移，地形高度合并为一批查询，标高调整按组归约。
+    BVH 路径仍在单线程中逐条投射射线，只是省去了逐组调用的开销；仅在提供 terrain_grid 且安装了 numba 时，
+    桩位计算与网格插值才由编译内核按组并行执行（见 layout_piles_with_constraints 的 use_terrain_grid）。
+    
+    :param terrain: 地形对象
+    :param group_centers: 组中心位置，形状 (G, 2)
+    :param row_angles: 各组行方向角度（弧度），形状 (G,)
+    :param num_piles: 每组桩数量（默认10根，对应2×5配置）
+    :param pile_spacings: 各组桩间距（m），形状 (G,) 或标量
+    :param exposed_height_range: 露出高度范围（m）
+    :param bvh: 地形 BVH 树（为 None 时使用 get_terrain_bvh 的缓存）
+    :param terrain_grid: 预计算的地形网格（见 precompute_terrain_grid）；提供时插值得到高度，不投射射线
+    :return: (桩位 (G, N, 2), 地形高度 (G, N), 露出高度 (G, N))，均为连续的 float32 数组
+    """
+    group_centers = np.asarray(group_centers, dtype=float).reshape(-1, 2)
+    num_groups = len(group_centers)
+    pile_spacings = np.broadcast_to(np.asarray(pile_spacings, dtype=float), (num_groups,)).copy()
     
     # 计算行和列（2×5配置）
     rows = 2
     cols = num_piles // rows
-    
-    # 旋转矩阵
-    cos_a = np.cos(row_angle)
-    sin_a = np.sin(row_angle)
-    rotation_matrix = np.array([
-        [cos_a, -sin_a],
-        [sin_a, cos_a]
-    ])
-    
-    # 收集所有位置和地形高度
-    positions_with_heights = []
-    
-    for row_idx in range(rows):
-        for col_idx in range(cols):
-            # 局部坐标
-            local_x = (col_idx - cols / 2.0) * pile_spacing
-            local_y = (row_idx - rows / 2.0) * 3.6  # 行间距3.6m（参考报告）
-            
-            # 旋转到行方向
-            local_pos = np.array([local_x, local_y])
-            rotated_pos = rotation_matrix @ local_pos
-            
-            # 全局位置
-            global_x = group_center[0] + rotated_pos[0]
-            global_y = group_center[1] + rotated_pos[1]
-            
-            # 获取地形高度
-            hit, location = bproc.object.scene_ray_cast(
-                [global_x, global_y, 100.0],
-                [0, 0, -1]
-            )
-            if hit:
-                terrain_z = location[2]
-            else:
-                terrain_z = 0.0
-            
-            positions_with_heights.append((np.array([global_x, global_y]), terrain_z))
+    unit_grid = _local_grid(rows, cols)
+    row_spacing = 3.6  # 行间距3.6m（参考报告）
+    
+    # 旋转矩阵（行方向角度量化到 _ROTATION_BINS 档后取缓存）
+    rotations = np.array([
+        _rotmat(round(float(row_angle) * _ROTATION_BINS / (2 * math.pi)) % _ROTATION_BINS)
+        for row_angle in row_angles
+    ]).reshape(-1, 2, 2)
+    
+    positions = np.empty((num_groups, len(unit_grid), 2), dtype=np.float32)
+    terrain_zs = np.empty((num_groups, len(unit_grid)), dtype=np.float32)
+    
+    if terrain_grid is not None and NUMBA_AVAILABLE:
+        # 旋转到行方向、平移到组中心并在地形网格上插值高度（编译内核，按组并行）
+        _place_groups_on_grid_jit(
+            unit_grid, pile_spacings, row_spacing, rotations, group_centers,
+            terrain_grid['heights'], terrain_grid['origin'], terrain_grid['res'], positions, terrain_zs
+        )
+    else:
+        # 局部坐标 → 旋转到行方向 → 平移到组中心（直接写入输出数组）
+        scales = np.column_stack([pile_spacings, np.full(num_groups, row_spacing)])
+        np.matmul(unit_grid[None, :, :] * scales[:, None, :], rotations.transpose(0, 2, 1), out=positions)
+        positions += group_centers[:, None, :]
+        
+        # 一次批量获取所有桩位的地形高度（射线仍逐条投射，不并行）
+        flat_positions = positions.reshape(-1, 2)
+        if terrain_grid is not None:
+            terrain_zs.reshape(-1)[:] = sample_terrain_grid(terrain_grid, flat_positions)
+        else:
+            if bvh is None:
+                bvh = get_terrain_bvh(terrain)
+            terrain_zs.reshape(-1)[:] = batch_ray_cast_down(flat_positions, bvh)
     
     # 计算目标标高（所有桩顶在同一平面）
-    # 方法：取最高地形点，其他点通过调节露出高度补偿
-    max_terrain_z = max(z for _, z in positions_with_heights)
-    target_top_z = max_terrain_z + exposed_height_range[0]  # 使用最小露出高度作为基准
-    
-    # 确保所有桩顶在容差范围内
-    for pos, terrain_z in positions_with_heights:
-        # 计算需要的露出高度以达到目标顶高
-        required_exposed = target_top_z - terrain_z
-        
-        # 限制在范围内
-        exposed_height = np.clip(required_exposed, exposed_height_range[0], exposed_height_range[1])
-        
-        # 如果超出范围，调整目标顶高（向下调整）
-        if exposed_height != required_exposed:
-            target_top_z = terrain_z + exposed_height
-        
-        pile_positions.append((pos, terrain_z))
+    # 方法：以最高地形点加最小露出高度为基准；若最低点因此超出最大露出高度，则整体下调到最低点可达的高度
+    exp_min, exp_max = exposed_height_range
+    target_top_z = np.minimum(terrain_zs.max(axis=1) + exp_min, terrain_zs.min(axis=1) + exp_max)
     
-    return pile_positions
+    # 各桩通过调节露出高度达到目标顶高（限制在允许范围内）
+    exposed_heights = np.clip(target_top_z[:, None] - terrain_zs, exp_min, exp_max)
+    
+    return positions, terrain_zs, exposed_heights
 
 
 def apply_engineering_tolerances(
     base_position: np.ndarray,
     row_alignment: bool = True,
-    vertical_deviation: float = 0.005  # 0.5%倾斜
+    vertical_deviation: float = 0.005,  # 0.5%倾斜
+    rng: Optional[np.random.Generator] = None
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
-    应用工程容差。
+    应用工程容差（单桩版本，等价于只含一根桩的 apply_engineering_tolerances_batch）。
     
     参考报告：
     - 行内约束：同一排桩的圆心偏差应极小（<10mm）
@@ -212,23 +513,104 @@ def apply_engineering_tolerances(
     :param base_position: 基础位置 [x, y]
     :param row_alignment: 是否在行内（True=严格对齐，False=允许抖动）
     :param vertical_deviation: 垂直度偏差（弧度，0.5% ≈ 0.005弧度）
+    :param rng: 随机数生成器，None 则使用模块级生成器
     :return: (最终位置, 倾斜角度 [tilt_x, tilt_y, tilt_z])
     """
-    if row_alignment:
-        # 行内：极小偏差（<10mm = 0.01m）
-        position_jitter = np.random.uniform(-0.005, 0.005, size=2)
-    else:
-        # 列间：相对宽松（±20cm）
-        position_jitter = np.random.uniform(-0.2, 0.2, size=2)
+    final_positions, tilts = apply_engineering_tolerances_batch(
+        np.asarray(base_position, dtype=float)[None, :2],
+        np.array([row_alignment]),
+        vertical_deviation=vertical_deviation,
+        rng=rng
+    )
+    return final_positions[0], tilts[0]
+
+
+def apply_engineering_tolerances_batch(
+    base_positions: np.ndarray,
+    row_mask: np.ndarray,
+    vertical_deviation: float = 0.005,  # 0.5%倾斜
+    rng: Optional[np.random.Generator] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量应用工程容差（所有桩的随机量按块一次抽取）。
+    
+    :param base_positions: 基础位置，形状 (N, 2)
+    :param row_mask: 是否在行内，形状 (N,)（True=严格对齐，False=允许抖动）
+    :param vertical_deviation: 垂直度偏差（弧度，0.5% ≈ 0.005弧度）
+    :param rng: 随机数生成器，None 则使用模块级生成器
+    :return: (最终位置 (N, 2), 倾斜角度 (N, 3) [tilt_x, tilt_y, tilt_z])
+    """
+    rng = rng if rng is not None else _get_rng()
+    n = len(base_positions)
+    
+    # 行内：极小偏差（<10mm）；列间：相对宽松（±20cm）
+    jitter_tight = rng.uniform(-0.005, 0.005, size=(n, 2))
+    jitter_loose = rng.uniform(-0.2, 0.2, size=(n, 2))
+    position_jitter = np.where(np.asarray(row_mask)[:, None], jitter_tight, jitter_loose)
+    
+    # 垂直度偏差（<0.5%）和随机旋转
+    tilts = np.column_stack([
+        rng.uniform(-vertical_deviation, vertical_deviation, size=(n, 2)),
+        rng.uniform(0, 2 * np.pi, size=n)
+    ])
+    
+    return base_positions + position_jitter, tilts
+
+
+def sample_group_centers(
+    num_groups: int,
+    area_size: float,
+    min_distance: float = 15.0,
+    max_attempts: int = 100,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    在区域内随机采样组中心，任意两中心距离不小于 min_distance。
     
-    final_position = base_position + position_jitter
+    每组最多尝试 max_attempts 个候选点，全部过近则放弃该组，因此返回的中心数可能少于 num_groups。
     
-    # 垂直度偏差（<0.5%）
-    tilt_x = np.random.uniform(-vertical_deviation, vertical_deviation)
-    tilt_y = np.random.uniform(-vertical_deviation, vertical_deviation)
-    tilt_z = np.random.uniform(0, 2 * np.pi)  # 随机旋转
+    :param num_groups: 组数量
+    :param area_size: 区域大小（m），候选点均匀分布在 [-area_size/2, area_size/2]²
+    :param min_distance: 最小组间距（m）
+    :param max_attempts: 每组最多尝试次数
+    :param rng: 随机数生成器，None 则使用模块级生成器
+    :return: 组中心，形状 (M, 2)，M ≤ num_groups
+    """
+    rng = rng if rng is not None else _get_rng()
+    group_centers = []
+    min_distance_sq = min_distance ** 2
+    
+    # 均匀网格空间哈希：格子边长 min_distance/√2，每格至多容纳一个组中心，
+    # 与候选点距离小于 min_distance 的已有中心只可能落在周围 5×5 格内
+    cell_size = min_distance / math.sqrt(2.0)
+    occupied: Dict[Tuple[int, int], Tuple[float, float]] = {}
     
-    return final_position, np.array([tilt_x, tilt_y, tilt_z])
+    # 所有候选点一次抽取
+    candidates = rng.uniform(-area_size/2, area_size/2, size=(num_groups, max_attempts, 2)).tolist()
+    
+    for group_candidates in candidates:
+        for center_x, center_y in group_candidates:
+            cx = math.floor(center_x / cell_size)
+            cy = math.floor(center_y / cell_size)
+            
+            # 检查是否与已有组太近
+            too_close = False
+            for dx in range(-2, 3):
+                for dy in range(-2, 3):
+                    existing_center = occupied.get((cx + dx, cy + dy))
+                    if existing_center is not None and \
+                            (center_x - existing_center[0])**2 + (center_y - existing_center[1])**2 < min_distance_sq:
+                        too_close = True
+                        break
+                if too_close:
+                    break
+            
+            if not too_close:
+                occupied[(cx, cy)] = (center_x, center_y)
+                group_centers.append((center_x, center_y))
+                break
+    
+    return np.array(group_centers, dtype=float).reshape(-1, 2)
 
 
 def layout_piles_with_constraints(
@@ -237,7 +619,10 @@ def layout_piles_with_constraints(
     num_groups: int = 20,
     piles_per_group: int = 10,
     road_width: float = 8.0,
-    asset_path: Optional[str] = None
+    asset_path: Optional[str] = None,
+    terrain_grid: Optional[Dict] = None,
+    rng: Optional[np.random.Generator] = None,
+    use_terrain_grid: Optional[bool] = None
 ) -> List[Dict]:
     """
     基于规范的智能排布主函数。
@@ -253,110 +638,138 @@ def layout_piles_with_constraints(
     :param piles_per_group: 每组桩数（默认10，对应2×5配置）
     :param road_width: 道路宽度（m）
     :param asset_path: 资产路径
+    :param terrain_grid: 预计算的地形网格（见 precompute_terrain_grid）；提供时坡度和桩位高度均查表获得
+    :param use_terrain_grid: 未提供 terrain_grid 时是否先栅格化地形（True=总是，False=从不，
+                             None=按射线数自动选择：网格射线数少于逐点射线数上限 4·G + G·P 时使用网格）
+    :param rng: 随机数生成器，None 则使用模块级生成器；所有随机量均按块从中抽取
     :return: 桩信息列表，每个元素包含位置、类型、参数等
     """
     pile_info_list = []
-    
-    # 随机生成组中心位置
-    group_centers = []
-    min_distance = 15.0  # 最小组间距
-    
-    for _ in range(num_groups):
-        attempts = 0
-        while attempts < 100:
-            center_x = np.random.uniform(-area_size/2, area_size/2)
-            center_y = np.random.uniform(-area_size/2, area_size/2)
-            
-            # 检查是否与已有组太近
-            too_close = False
-            for existing_center in group_centers:
-                dist = np.sqrt((center_x - existing_center[0])**2 + (center_y - existing_center[1])**2)
-                if dist < min_distance:
-                    too_close = True
-                    break
-            
-            if not too_close:
-                group_centers.append(np.array([center_x, center_y]))
-                break
-            
-            attempts += 1
-    
-    # 为每组创建桩
-    for group_idx, group_center in enumerate(group_centers):
-        # 随机行方向
-        row_angle = np.random.uniform(0, 2 * np.pi)
-        
-        # 获取组中心的地形坡度
-        slope_angle, slope_direction = get_terrain_slope(
-            group_center[0],
-            group_center[1],
-            terrain
-        )
-        
-        # 计算排间距
-        pile_spacing = calculate_row_spacing(slope_angle, slope_direction)
-        
-        # 创建阶梯状桩组
-        pile_positions = create_stepped_pile_group(
-            terrain,
-            group_center,
-            row_angle,
-            num_piles=piles_per_group,
-            pile_spacing=pile_spacing
-        )
+    rng = rng if rng is not None else _get_rng()
+    
+    # 地形 BVH 只构建一次，供栅格化或所有坡度采样和桩位高度查询共用（有预计算网格时无需射线）
+    bvh = None
+    if terrain_grid is None:
+        bvh = get_terrain_bvh(terrain, rebuild=True)
+        if use_terrain_grid is None:
+            # 逐点路径：每组 4 条坡度射线 + 每桩 1 条高度射线；网格路径：每个网格节点 1 条射线
+            use_terrain_grid = _terrain_grid_points(area_size, 2.0) ** 2 < num_groups * (4 + piles_per_group)
+        if use_terrain_grid:
+            terrain_grid = precompute_terrain_grid(terrain, area_size, bvh=bvh)
+    
+    # 随机生成组中心位置（组间距至少 15m）
+    centers = sample_group_centers(num_groups, area_size, min_distance=15.0, rng=rng)
+    
+    # 随机行方向
+    row_angles = rng.uniform(0, 2 * np.pi, size=len(centers))
+    
+    # 一次获取所有组中心的地形坡度
+    slope_angles, slope_directions = get_terrain_slope(
+        centers[:, 0],
+        centers[:, 1],
+        terrain,
+        bvh=bvh,
+        terrain_grid=terrain_grid
+    )
+    
+    # 一次计算所有组的排间距
+    pile_spacings = calculate_row_spacing(slope_angles, slope_directions)
+    
+    # 一次创建所有桩组
+    group_positions, group_terrain_zs, group_exposed_heights = create_stepped_pile_groups(
+        terrain,
+        centers,
+        row_angles,
+        num_piles=piles_per_group,
+        pile_spacings=pile_spacings,
+        bvh=bvh,
+        terrain_grid=terrain_grid
+    )
+    num_groups_created, piles_in_group = group_terrain_zs.shape
+    base_positions = group_positions.reshape(-1, 2)
+    terrain_zs = group_terrain_zs.reshape(-1)
+    exposed_heights = group_exposed_heights.reshape(-1)
+    group_ids = np.repeat(np.arange(num_groups_created), piles_in_group)
+    # 桩在组内的序号
+    pile_indices = np.tile(np.arange(piles_in_group), num_groups_created)
+    
+    # 为所有桩一次性应用工程容差
+    # 组内第一排（行优先排列的前半部分）严格对齐，第二排相对第一排允许抖动
+    row_mask = pile_indices < (piles_per_group // 2)
+    final_positions, tilts = apply_engineering_tolerances_batch(base_positions, row_mask, rng=rng)
+    
+    # 桩型及其参数按结构数组（SoA）一次抽取，逐桩循环中只做索引和打包
+    # 露出高度由阶梯桩组计算（同组桩顶共面），不再随机抽取
+    # 桩型概率：PHC 40%，螺旋钢桩 30%，灌注桩 30%（可根据需要调整）
+    n_piles = len(terrain_zs)
+    pile_type_rand = rng.random(n_piles)
+    phc_diameters = rng.choice([300, 400, 500], n_piles)
+    phc_age_states = rng.choice(["new", "aged"], n_piles, p=[0.7, 0.3])
+    phc_hoop_clamps = rng.random(n_piles) < 0.8
+    phc_cracked_tops = rng.random(n_piles) < 0.2
+    steel_diameters = rng.choice([76, 89, 114, 159], n_piles)
+    steel_lengths = rng.uniform(1.5, 2.5, n_piles)
+    steel_rust_levels = rng.choice(["new", "light", "medium", "heavy"], n_piles, p=[0.5, 0.3, 0.15, 0.05])
+    cast_lengths = rng.uniform(1.8, 2.5, n_piles)
+    cast_leakages = rng.random(n_piles) < 0.3
+    
+    # 桩型判定一次完成；各列在打包前整体转换为 Python 原生标量列表，循环内不再逐元素装箱 NumPy 标量
+    pile_types = np.select(
+        [pile_type_rand < 0.4, pile_type_rand < 0.7],
+        ["PHC", "spiral_steel"],
+        "cast_in_place"
+    ).tolist()
+    phc_diameters = phc_diameters.tolist()
+    phc_age_states = phc_age_states.tolist()
+    phc_hoop_clamps = phc_hoop_clamps.tolist()
+    phc_cracked_tops = phc_cracked_tops.tolist()
+    steel_diameters = steel_diameters.tolist()
+    steel_lengths = steel_lengths.tolist()
+    steel_rust_levels = steel_rust_levels.tolist()
+    cast_lengths = cast_lengths.tolist()
+    cast_leakages = cast_leakages.tolist()
+    exposed_heights = exposed_heights.tolist()
+    terrain_zs = terrain_zs.tolist()
+    group_ids = group_ids.tolist()
+    
+    for i, pile_type in enumerate(pile_types):
+        if pile_type == "PHC":
+            pile_params = {
+                'diameter': phc_diameters[i],
+                'exposed_height': exposed_heights[i],
+                'age_state': phc_age_states[i],
+                'has_hoop_clamp': phc_hoop_clamps[i],
+                'has_cracked_top': phc_cracked_tops[i],
+                'asset_path': asset_path
+            }
+        elif pile_type == "spiral_steel":
+            pile_params = {
+                'pipe_diameter': steel_diameters[i],
+                'total_length': steel_lengths[i],
+                'exposed_height': exposed_heights[i],
+                'rust_level': steel_rust_levels[i],
+                'asset_path': asset_path
+            }
+        else:
+            pile_params = {
+                'diameter': 0.3,
+                'total_length': cast_lengths[i],
+                'exposed_height': exposed_heights[i],
+                'has_spiral_marks': True,
+                'has_leakage': cast_leakages[i],
+                'asset_path': asset_path
+            }
         
-        # 为每个桩应用工程容差
-        for pile_idx, (base_pos, terrain_z) in enumerate(pile_positions):
-            # 行内对齐（同一组内）
-            is_in_row = (pile_idx % (piles_per_group // 2)) < (piles_per_group // 2)
-            
-            final_pos, tilt = apply_engineering_tolerances(
-                base_pos,
-                row_alignment=is_in_row
-            )
-            
-            # 随机选择桩类型（可根据需要调整概率）
-            pile_type_rand = np.random.random()
-            if pile_type_rand < 0.4:
-                pile_type = "PHC"
-                pile_params = {
-                    'diameter': np.random.choice([300, 400, 500]),
-                    'exposed_height': np.random.uniform(0.3, 0.5),
-                    'age_state': np.random.choice(["new", "aged"], p=[0.7, 0.3]),
-                    'has_hoop_clamp': np.random.random() < 0.8,
-                    'has_cracked_top': np.random.random() < 0.2,
-                    'asset_path': asset_path
-                }
-            elif pile_type_rand < 0.7:
-                pile_type = "spiral_steel"
-                pile_params = {
-                    'pipe_diameter': np.random.choice([76, 89, 114, 159]),
-                    'total_length': np.random.uniform(1.5, 2.5),
-                    'exposed_height': np.random.uniform(0.3, 0.5),
-                    'rust_level': np.random.choice(["new", "light", "medium", "heavy"], p=[0.5, 0.3, 0.15, 0.05]),
-                    'asset_path': asset_path
-                }
-            else:
-                pile_type = "cast_in_place"
-                pile_params = {
-                    'diameter': 0.3,
-                    'total_length': np.random.uniform(1.8, 2.5),
-                    'exposed_height': np.random.uniform(0.3, 0.5),
-                    'has_spiral_marks': True,
-                    'has_leakage': np.random.random() < 0.3,
-                    'asset_path': asset_path
-                }
-            
-            pile_info_list.append({
-                'position': final_pos,
-                'terrain_z': terrain_z,
-                'tilt': tilt,
-                'pile_type': pile_type,
-                'pile_params': pile_params,
-                'group_id': group_idx
-            })
-    
-    print(f"Created {len(pile_info_list)} piles in {len(group_centers)} groups with constraint-based layout")
+        pile_info_list.append({
+            'position': final_positions[i],
+            'terrain_z': terrain_zs[i],
+            'tilt': tilts[i],
+            'pile_type': pile_type,
+            'pile_params': pile_params,
+            'group_id': group_ids[i]
+        })
+    
+    print(f"Created {len(pile_info_list)} piles in {len(centers)} groups with constraint-based layout")
     
     return pile_info_list
 
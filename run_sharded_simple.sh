@@ -0,0 +1,81 @@
+#!/bin/bash
+# Sharded BlenderProc Rendering for generate_solar_farm_simple.py
+# Renders as few frames as possible per BlenderProc run: each worker process generates its own
+# scene and a disjoint chunk of frames (deterministic seed = base_seed + worker_idx) into
+# <output_dir>/shard_<i>/, then all shards are merged into <output_dir>/images and <output_dir>/labels.
+#
+# If any worker fails, the shards are left in place and nothing is merged, unless --allow-partial
+# is given, in which case the shards of the successful workers are merged anyway.
+#
+# Usage:
+#   ./run_sharded_simple.sh [--allow-partial] [num_workers] [frames_per_worker] [output_dir] [base_seed]
+#
+# Example:
+#   ./run_sharded_simple.sh 4 1 output/solar_farm_nadir 1000
+
+ALLOW_PARTIAL=0
+ARGS=()
+for ARG in "$@"; do
+    if [ "$ARG" = "--allow-partial" ]; then
+        ALLOW_PARTIAL=1
+    else
+        ARGS+=("$ARG")
+    fi
+done
+set -- "${ARGS[@]}"
+
+NUM_WORKERS=${1:-2}
+FRAMES_PER_WORKER=${2:-1}
+OUTPUT_DIR=${3:-"output/solar_farm_nadir"}
+BASE_SEED=${4:-1000}
+SCRIPT_NAME="generate_solar_farm_simple.py"
+
+echo "=========================================="
+echo "Sharded BlenderProc Rendering"
+echo "=========================================="
+echo "Workers: $NUM_WORKERS"
+echo "Frames per worker: $FRAMES_PER_WORKER"
+echo "Output directory: $OUTPUT_DIR"
+echo "Base seed: $BASE_SEED"
+echo "=========================================="
+
+if [ ! -f "$SCRIPT_NAME" ]; then
+    echo "Error: Script '$SCRIPT_NAME' not found!"
+    exit 1
+fi
+
+mkdir -p "$OUTPUT_DIR"
+
+declare -a PIDS=()
+for WORKER_IDX in $(seq 0 $((NUM_WORKERS - 1))); do
+    LOG_FILE="${OUTPUT_DIR}/shard_${WORKER_IDX}.log"
+    blenderproc run "$SCRIPT_NAME" "$OUTPUT_DIR" \
+        --worker_idx "$WORKER_IDX" \
+        --frames_per_worker "$FRAMES_PER_WORKER" \
+        --seed "$BASE_SEED" \
+        > "$LOG_FILE" 2>&1 &
+    PIDS+=($!)
+    echo "  Worker $WORKER_IDX started with PID: ${PIDS[-1]}"
+done
+
+FAILED=0
+for i in "${!PIDS[@]}"; do
+    if wait ${PIDS[$i]}; then
+        echo "✓ Worker $i completed"
+    else
+        echo "✗ Worker $i failed (see ${OUTPUT_DIR}/shard_${i}.log)"
+        FAILED=$((FAILED + 1))
+    fi
+done
+
+if [ $FAILED -ne 0 ] && [ $ALLOW_PARTIAL -eq 0 ]; then
+    echo "✗ $FAILED worker(s) failed, shards left unmerged in $OUTPUT_DIR (rerun with --allow-partial to merge anyway)"
+    exit 1
+fi
+
+python merge_shards.py "$OUTPUT_DIR" || exit 1
+
+if [ $FAILED -ne 0 ]; then
+    echo "✗ $FAILED worker(s) failed, merged the remaining shards"
+    exit 1
+fi
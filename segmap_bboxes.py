@@ -0,0 +1,125 @@
+"""
+Per-instance pixel bounding boxes from instance segmentation maps.
+
+Pure NumPy (plus optional numba) so it can be imported and tested without Blender.
+"""
+
+import numpy as np
+from typing import Tuple
+
+# Optional: JIT-compiled bbox reduction (falls back to NumPy when numba is not installed)
+try:
+    from numba import njit, prange, get_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True, boundscheck=False)
+    def _reduce_bboxes(segmap, out_xmin, out_xmax, out_ymin, out_ymax, max_id, num_chunks):
+        """
+        Reduce per-instance bbox extents of a 2D instance map in one fused pass.
+
+        Each thread reduces a band of rows into its own local arrays, which are merged afterwards,
+        so no atomics are needed. Instances absent from the map keep x_max == -1.
+
+        :param segmap: Instance segmentation map (H, W) with non-negative integer ids
+        :param out_xmin: Output array (max_id + 1,) for minimum x per instance id
+        :param out_xmax: Output array (max_id + 1,) for maximum x per instance id
+        :param out_ymin: Output array (max_id + 1,) for minimum y per instance id
+        :param out_ymax: Output array (max_id + 1,) for maximum y per instance id
+        :param max_id: Largest instance id in segmap
+        :param num_chunks: Number of row bands, at most one per thread and one per row
+        """
+        height, width = segmap.shape
+        rows_per_chunk = (height + num_chunks - 1) // num_chunks
+
+        local_xmin = np.full((num_chunks, max_id + 1), width, dtype=np.int64)
+        local_xmax = np.full((num_chunks, max_id + 1), -1, dtype=np.int64)
+        local_ymin = np.full((num_chunks, max_id + 1), height, dtype=np.int64)
+        local_ymax = np.full((num_chunks, max_id + 1), -1, dtype=np.int64)
+
+        for chunk in prange(num_chunks):
+            for y in range(chunk * rows_per_chunk, min(height, (chunk + 1) * rows_per_chunk)):
+                for x in range(width):
+                    i = segmap[y, x]
+                    if i:  # Skip background
+                        if x < local_xmin[chunk, i]:
+                            local_xmin[chunk, i] = x
+                        if x > local_xmax[chunk, i]:
+                            local_xmax[chunk, i] = x
+                        if y < local_ymin[chunk, i]:
+                            local_ymin[chunk, i] = y
+                        if y > local_ymax[chunk, i]:
+                            local_ymax[chunk, i] = y
+
+        for i in range(max_id + 1):
+            out_xmin[i] = width
+            out_xmax[i] = -1
+            out_ymin[i] = height
+            out_ymax[i] = -1
+            for chunk in range(num_chunks):
+                out_xmin[i] = min(out_xmin[i], local_xmin[chunk, i])
+                out_xmax[i] = max(out_xmax[i], local_xmax[chunk, i])
+                out_ymin[i] = min(out_ymin[i], local_ymin[chunk, i])
+                out_ymax[i] = max(out_ymax[i], local_ymax[chunk, i])
+
+
+def _instance_bboxes_numpy(segmap: np.ndarray, max_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                                     np.ndarray, np.ndarray]:
+    """
+    NumPy implementation of instance_bboxes().
+
+    Reduces per-instance bbox extents indexed directly by instance id, instead of one full-frame
+    mask per instance. np.bincount finds the present ids in O(N) (np.unique would sort all pixels).
+
+    :param segmap: Instance segmentation map (H, W)
+    :param max_id: Largest instance id in segmap
+    :return: Tuple of (instance_ids, x_min, x_max, y_min, y_max) arrays, one entry per instance
+    """
+    height, width = segmap.shape[:2]
+    ids = segmap.ravel()
+    unique_ids = np.nonzero(np.bincount(ids, minlength=max_id + 1))[0]
+    ys, xs = np.divmod(np.arange(ids.size), width)
+
+    x_min = np.full(max_id + 1, width)
+    x_max = np.full(max_id + 1, -1)
+    y_min = np.full(max_id + 1, height)
+    y_max = np.full(max_id + 1, -1)
+    np.minimum.at(x_min, ids, xs)
+    np.maximum.at(x_max, ids, xs)
+    np.minimum.at(y_min, ids, ys)
+    np.maximum.at(y_max, ids, ys)
+    return unique_ids, x_min[unique_ids], x_max[unique_ids], y_min[unique_ids], y_max[unique_ids]
+
+
+def instance_bboxes(segmap: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the pixel bbox of every instance in a segmentation map in a single pass.
+
+    The numba kernel skips the background id 0; the NumPy fallback reports it like any other id,
+    so callers should filter it out.
+
+    :param segmap: Instance segmentation map (H, W)
+    :return: Tuple of (instance_ids, x_min, x_max, y_min, y_max) arrays, one entry per instance
+    """
+    max_id = int(segmap.max()) if segmap.size > 0 else 0
+
+    # Instance ids are small integers: use the smallest dtype that fits to cut memory traffic
+    if max_id < np.iinfo(np.uint16).max:
+        segmap = segmap.astype(np.uint16, copy=False)
+
+    if NUMBA_AVAILABLE:
+        x_min = np.empty(max_id + 1, dtype=np.int64)
+        x_max = np.empty(max_id + 1, dtype=np.int64)
+        y_min = np.empty(max_id + 1, dtype=np.int64)
+        y_max = np.empty(max_id + 1, dtype=np.int64)
+        # The thread count is read here rather than inside the kernel: a get_num_threads() call in
+        # the kernel is a dynamic global, which keeps numba from caching the compiled function on disk
+        num_chunks = max(1, min(get_num_threads(), segmap.shape[0]))
+        _reduce_bboxes(np.ascontiguousarray(segmap), x_min, x_max, y_min, y_max, max_id, num_chunks)
+        unique_ids = np.nonzero(x_max >= 0)[0]
+        return unique_ids, x_min[unique_ids], x_max[unique_ids], y_min[unique_ids], y_max[unique_ids]
+
+    return _instance_bboxes_numpy(segmap, max_id)
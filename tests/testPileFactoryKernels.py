@@ -0,0 +1,55 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pile_factory
+
+
+class UnitTestCheckPileFactoryKernels(unittest.TestCase):
+
+    def test_fill_rings_numpy(self):
+        """ The broadcast ring fill matches the per-vertex formula.
+        """
+        c, s = pile_factory._unit_circle(16)
+        radii = np.array([0.2, 0.25, 0.3], dtype=np.float32)
+        zs = np.array([0.0, 0.5, 1.5], dtype=np.float32)
+        out = np.empty((3, 16, 3), dtype=np.float32)
+        pile_factory._fill_rings_numpy(c, s, radii, zs, out)
+        for r in range(3):
+            for k in range(16):
+                np.testing.assert_allclose(out[r, k], (radii[r] * c[k], radii[r] * s[k], zs[r]), rtol=1e-6)
+
+    @unittest.skipUnless(pile_factory.NUMBA_AVAILABLE, "numba is not installed")
+    def test_fill_rings_jit_matches_numpy(self):
+        """ The numba ring fill gives the same vertices as the broadcast version.
+        """
+        rng = np.random.default_rng(0)
+        for segments in (8, 64, 257):
+            c, s = pile_factory._unit_circle(segments)
+            radii = rng.uniform(0.1, 0.5, size=5).astype(np.float32)
+            zs = rng.uniform(-1.0, 3.0, size=5).astype(np.float32)
+            expected = np.empty((5, segments, 3), dtype=np.float32)
+            actual = np.empty_like(expected)
+            pile_factory._fill_rings_numpy(c, s, radii, zs, expected)
+            pile_factory._fill_rings_jit(c, s, radii, zs, actual)
+            np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-7)
+
+    @unittest.skipUnless(pile_factory.NUMBA_AVAILABLE, "numba is not installed")
+    def test_fill_torus_jit_matches_numpy(self):
+        """ The numba torus fill gives the same vertices as the broadcast version.
+        """
+        for major_seg, minor_seg in ((8, 6), (64, 16), (129, 33)):
+            cu, su = pile_factory._unit_circle(major_seg)
+            cv, sv = pile_factory._unit_circle(minor_seg)
+            expected = np.empty((major_seg, minor_seg, 3), dtype=np.float32)
+            actual = np.empty_like(expected)
+            pile_factory._fill_torus_numpy(cu, su, cv, sv, 0.3, 0.02, expected)
+            pile_factory._fill_torus_jit(cu, su, cv, sv, np.float32(0.3), np.float32(0.02), actual)
+            np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import pile_layout_engine
+
+
+def _brute_force_group_centers(candidates: np.ndarray, min_distance: float) -> np.ndarray:
+    """ Reference rejection sampling: test every candidate against all accepted centers. """
+    accepted = []
+    for group_candidates in candidates:
+        for candidate in group_candidates:
+            if all(np.sum((candidate - center) ** 2) >= min_distance ** 2 for center in accepted):
+                accepted.append(candidate)
+                break
+    return np.array(accepted, dtype=float).reshape(-1, 2)
+
+
+def _synthetic_terrain_grid(rng: np.random.Generator, area_size: float = 60.0, res: float = 2.0) -> dict:
+    """ Terrain grid dict as returned by precompute_terrain_grid, with a smooth random height field. """
+    n = int(np.ceil(area_size / res)) + 1
+    coords = -area_size / 2.0 + np.arange(n) * res
+    xs, ys = np.meshgrid(coords, coords)
+    heights = (3.0 * np.sin(xs / 7.0) * np.cos(ys / 5.0) + rng.normal(0.0, 0.1, xs.shape)).astype(np.float32)
+    return {'heights': heights, 'origin': -area_size / 2.0, 'res': res}
+
+
+class UnitTestCheckPileLayoutEngine(unittest.TestCase):
+
+    def test_group_centers_match_brute_force(self):
+        """ The spatial hash accepts exactly the candidates a full pairwise check accepts.
+        """
+        for seed, (num_groups, area_size, min_distance) in enumerate([(20, 200.0, 15.0), (80, 120.0, 15.0),
+                                                                       (30, 50.0, 7.5), (5, 10.0, 15.0)]):
+            centers = pile_layout_engine.sample_group_centers(num_groups, area_size, min_distance,
+                                                              rng=np.random.default_rng(seed))
+            candidates = np.random.default_rng(seed).uniform(-area_size / 2, area_size / 2, size=(num_groups, 100, 2))
+            np.testing.assert_array_equal(centers, _brute_force_group_centers(candidates, min_distance))
+
+    def test_group_centers_min_distance(self):
+        """ No two sampled centers are closer than min_distance.
+        """
+        centers = pile_layout_engine.sample_group_centers(200, 200.0, 15.0, rng=np.random.default_rng(42))
+        self.assertGreater(len(centers), 1)
+        distances = np.linalg.norm(centers[:, None, :] - centers[None, :, :], axis=-1)
+        np.fill_diagonal(distances, np.inf)
+        self.assertGreaterEqual(distances.min(), 15.0)
+
+    @unittest.skipUnless(pile_layout_engine.NUMBA_AVAILABLE, "numba is not installed")
+    def test_bilinear_jit_matches_sample_terrain_grid(self):
+        """ The scalar numba interpolation matches the vectorized NumPy one, including clamping outside the grid.
+        """
+        rng = np.random.default_rng(3)
+        terrain_grid = _synthetic_terrain_grid(rng)
+        xy = rng.uniform(-40.0, 40.0, size=(500, 2))
+        expected = pile_layout_engine.sample_terrain_grid(terrain_grid, xy)
+        actual = [pile_layout_engine._bilinear_jit(terrain_grid['heights'], terrain_grid['origin'], terrain_grid['res'],
+                                                   x, y) for x, y in xy]
+        np.testing.assert_allclose(actual, expected, rtol=1e-6, atol=1e-6)
+
+    @unittest.skipUnless(pile_layout_engine.NUMBA_AVAILABLE, "numba is not installed")
+    def test_grid_kernel_matches_numpy_fallback(self):
+        """ Placing pile groups on the terrain grid gives the same result with the numba kernel and without it.
+        """
+        rng = np.random.default_rng(4)
+        terrain_grid = _synthetic_terrain_grid(rng)
+        centers = rng.uniform(-25.0, 25.0, size=(12, 2))
+        row_angles = rng.uniform(0, 2 * np.pi, size=12)
+        pile_spacings = rng.uniform(3.6, 4.7, size=12)
+
+        def place():
+            return pile_layout_engine.create_stepped_pile_groups(None, centers, row_angles, num_piles=10,
+                                                                 pile_spacings=pile_spacings, terrain_grid=terrain_grid)
+
+        actual = place()
+        with mock.patch.object(pile_layout_engine, "NUMBA_AVAILABLE", False):
+            expected = place()
+        for actual_array, expected_array in zip(actual, expected):
+            self.assertEqual(actual_array.shape, expected_array.shape)
+            np.testing.assert_allclose(actual_array, expected_array, rtol=1e-5, atol=1e-4)
+
+
+if __name__ == "__main__":
+    unittest.main()
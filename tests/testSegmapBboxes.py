@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import segmap_bboxes
+
+
+def _random_segmap(rng: np.random.Generator, height: int = 61, width: int = 83, num_instances: int = 12) -> np.ndarray:
+    """ Background map with randomly placed rectangular instances (later ones overlap earlier ones). """
+    segmap = np.zeros((height, width), dtype=np.int32)
+    for instance_id in range(1, num_instances + 1):
+        y0, x0 = rng.integers(0, height), rng.integers(0, width)
+        y1, x1 = rng.integers(y0, height) + 1, rng.integers(x0, width) + 1
+        segmap[y0:y1, x0:x1] = instance_id
+    return segmap
+
+
+def _brute_force_bboxes(segmap: np.ndarray) -> dict:
+    """ Reference bboxes from one full-frame mask per instance id. """
+    bboxes = {}
+    for instance_id in np.unique(segmap):
+        ys, xs = np.nonzero(segmap == instance_id)
+        bboxes[int(instance_id)] = (xs.min(), xs.max(), ys.min(), ys.max())
+    return bboxes
+
+
+def _as_dict(result, skip_background: bool = True) -> dict:
+    unique_ids, x_min, x_max, y_min, y_max = result
+    return {int(i): (a, b, c, d) for i, a, b, c, d in zip(unique_ids, x_min, x_max, y_min, y_max)
+            if not (skip_background and i == 0)}
+
+
+class UnitTestCheckSegmapBboxes(unittest.TestCase):
+
+    def test_numpy_fallback_matches_brute_force(self):
+        """ The np.minimum.at/np.maximum.at reduction matches per-instance masks, background included.
+        """
+        rng = np.random.default_rng(0)
+        for _ in range(5):
+            segmap = _random_segmap(rng)
+            result = segmap_bboxes._instance_bboxes_numpy(segmap, int(segmap.max()))
+            self.assertEqual(_as_dict(result, skip_background=False), _brute_force_bboxes(segmap))
+
+    @unittest.skipUnless(segmap_bboxes.NUMBA_AVAILABLE, "numba is not installed")
+    def test_numba_kernel_matches_numpy_fallback(self):
+        """ The parallel numba reduction gives the same boxes as the NumPy fallback (background excluded).
+        """
+        rng = np.random.default_rng(1)
+        for height in (1, 7, 61):
+            segmap = _random_segmap(rng, height=height).astype(np.uint16)
+            max_id = int(segmap.max())
+            expected = _as_dict(segmap_bboxes._instance_bboxes_numpy(segmap, max_id))
+            self.assertEqual(_as_dict(segmap_bboxes.instance_bboxes(segmap)), expected)
+
+    def test_empty_and_background_only(self):
+        """ A map without instances yields no foreground boxes.
+        """
+        self.assertEqual(_as_dict(segmap_bboxes.instance_bboxes(np.zeros((4, 5), dtype=np.int32))), {})
+
+
+if __name__ == "__main__":
+    unittest.main()